@@ -0,0 +1,127 @@
+"""端到端抓取吞吐基准：在本地模拟站点上运行 CrazyCarScraper.login + start_crawl
+
+输出 比赛/秒、请求延迟 p50/p99 和进程峰值内存；指定 --min-rate 时低于该吞吐即以非零状态退出，
+可在发布前发现抓取性能退化。
+
+用法: python benchmarks/bench_crawl.py --matches 2000 --latency 0.05 --error-rate 0.02
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.append(str(root))
+
+from src.core.scraper import CrazyCarScraper
+from src.core.session_store import SessionStore
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(pct / 100 * (len(values) - 1)))))
+    return values[k]
+
+def start_server(args):
+    cmd = [sys.executable, str(Path(__file__).resolve().parent / "mock_server.py"), "--port", "0",
+           "--matches", str(args.matches), "--per-page", str(args.per_page), "--latency", str(args.latency),
+           "--error-rate", str(args.error_rate), "--throttle-rate", str(args.throttle_rate)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.startswith("READY "):
+        proc.kill()
+        raise RuntimeError(f"模拟站点启动失败: {line}")
+    return proc, line.split(" ", 1)[1]
+
+def run_once(base_url, args, session_dir):
+    scraper = CrazyCarScraper("13800000000", "mock", log_callback=print if args.verbose else (lambda m: None),
+                              max_workers=args.workers, use_cache=False, base_url=base_url)
+    scraper.session_store = SessionStore(session_dir)
+
+    latencies = []
+    scraper.session.hooks["response"].append(lambda r, *a, **k: latencies.append(r.elapsed.total_seconds()))
+
+    t0 = time.perf_counter()
+    if not scraper.login(use_saved=False):
+        raise RuntimeError("登录模拟站点失败")
+    t_login = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    header, records = scraper.start_crawl("组队竞速", ["__不存在的地图__"], "", fast_seek=False)
+    t_crawl = time.perf_counter() - t0
+
+    matches = len({(r[1], r[2]) for r in records})
+    return {
+        "login_s": round(t_login, 3),
+        "crawl_s": round(t_crawl, 3),
+        "matches": matches,
+        "records": len(records),
+        "matches_per_s": round(matches / t_crawl, 1) if t_crawl else 0.0,
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "retries": scraper.metrics.get("retries"),
+        "dropped": len(scraper.dropped),
+        "metrics": scraper.metrics.snapshot(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取吞吐基准")
+    parser.add_argument("--matches", type=int, default=1000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--min-rate", type=float, default=0.0, help="最低 比赛/秒，低于此值视为性能退化")
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    proc, base_url = start_server(args)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as session_dir:
+            for i in range(args.runs):
+                res = run_once(base_url, args, session_dir)
+                results.append(res)
+                print(f"[{i + 1}/{args.runs}] {res['matches']} 场 / {res['crawl_s']} s = {res['matches_per_s']} 场/秒  "
+                      f"p50 {res['p50_ms']} ms  p99 {res['p99_ms']} ms  重试 {res['retries']}  丢失 {res['dropped']}")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    best = max(results, key=lambda r: r["matches_per_s"])
+    summary = {"config": vars(args), "runs": results, "best_matches_per_s": best["matches_per_s"],
+               "peak_rss_mb": round(peak_rss_mb() or 0, 1)}
+    print(f"最佳吞吐: {best['matches_per_s']} 场/秒, 峰值内存: {summary['peak_rss_mb']} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    if args.min_rate and best["matches_per_s"] < args.min_rate:
+        print(f"❌ 吞吐低于阈值 {args.min_rate} 场/秒")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
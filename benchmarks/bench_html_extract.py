@@ -0,0 +1,41 @@
+"""对比快速表格提取与 BeautifulSoup(html.parser) 在样例页面上的解析耗时
+
+用法: python benchmarks/bench_html_extract.py [次数]
+"""
+import sys
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.append(str(root))
+
+from src.core.html_extract import extract_page, parse_page_bs4
+
+SAMPLES_DIR = Path(__file__).resolve().parent / "samples"
+
+def bench(func, html, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(html)
+    return (time.perf_counter() - start) / rounds
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{'样例':<20}{'bs4 (ms)':>12}{'fast (ms)':>12}{'加速比':>10}")
+    for path in sorted(SAMPLES_DIR.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+
+        # 先确认两条路径的结果一致
+        fast, slow = extract_page(html), parse_page_bs4(html)
+        if fast != slow:
+            print(f"❌ {path.name}: 快速提取结果与 BeautifulSoup 不一致")
+            print(f"   fast: {fast}")
+            print(f"   bs4:  {slow}")
+            sys.exit(1)
+
+        t_slow = bench(parse_page_bs4, html, rounds)
+        t_fast = bench(extract_page, html, rounds)
+        print(f"{path.name:<20}{t_slow * 1000:>12.3f}{t_fast * 1000:>12.3f}{t_slow / t_fast:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""启动耗时基准：在全新的子进程中测量桌面程序的导入耗时与首个窗口出现的耗时
+
+同时检查启动阶段没有导入重型模块 (pandas、requests、ddddocr 等应在第一次使用时才加载)。
+超出 --import-budget / --window-budget 或加载了重型模块时以非零状态退出，可在发布前发现启动退化。
+没有图形环境 (或未安装 customtkinter) 时跳过对应的测量。
+
+用法: python benchmarks/bench_startup.py --runs 5 --import-budget 1.0 --window-budget 2.5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+
+# 启动阶段不应出现的模块
+HEAVY_MODULES = ["pandas", "numpy", "requests", "bs4", "ddddocr", "onnxruntime", "openpyxl", "pyarrow"]
+
+# 在子进程中执行：每次都是冷启动的解释器，不受本进程已导入模块影响
+PROBE = r"""
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+target, window = sys.argv[2], sys.argv[3] == "1"
+result = {}
+t0 = time.perf_counter()
+try:
+    if target == "gui":
+        from src.gui.main_window import App
+    else:
+        import src.cli
+except ImportError as e:
+    print(json.dumps({"skipped": f"导入失败: {e}"}))
+    sys.exit(0)
+result["import"] = time.perf_counter() - t0
+result["heavy"] = [m for m in json.loads(sys.argv[4]) if m in sys.modules]
+if target == "gui" and window:
+    try:
+        app = App()
+        app.update()
+        result["window"] = time.perf_counter() - t0
+        app.destroy()
+    except Exception as e:
+        result["window_skipped"] = str(e)
+print(json.dumps(result))
+"""
+
+def probe(target, window):
+    out = subprocess.run([sys.executable, "-c", PROBE, str(root), target, "1" if window else "0",
+                          json.dumps(HEAVY_MODULES)], capture_output=True, text=True, cwd=root)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "子进程异常退出")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="桌面程序启动耗时基准")
+    parser.add_argument("--runs", type=int, default=5, help="重复次数，取中位数")
+    parser.add_argument("--import-budget", type=float, default=1.0, help="导入耗时上限 (秒)")
+    parser.add_argument("--window-budget", type=float, default=2.5, help="首个窗口出现耗时上限 (秒)")
+    parser.add_argument("--no-window", action="store_true", help="只测量导入，不创建窗口")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    report, failures = {}, []
+    for target in ("gui", "cli"):
+        runs = [probe(target, target == "gui" and not args.no_window) for _ in range(args.runs)]
+        if "skipped" in runs[0]:
+            report[target] = {"skipped": runs[0]["skipped"]}
+            continue
+
+        entry = {"import_s": statistics.median(r["import"] for r in runs),
+                 "heavy_modules": sorted({m for r in runs for m in r["heavy"]})}
+        windows = [r["window"] for r in runs if "window" in r]
+        if windows:
+            entry["window_s"] = statistics.median(windows)
+        elif "window_skipped" in runs[0]:
+            entry["window_skipped"] = runs[0]["window_skipped"]
+        report[target] = entry
+
+        if entry["import_s"] > args.import_budget:
+            failures.append(f"{target} 导入耗时 {entry['import_s']:.3f}s 超出预算 {args.import_budget}s")
+        if entry.get("window_s", 0) > args.window_budget:
+            failures.append(f"首个窗口耗时 {entry['window_s']:.3f}s 超出预算 {args.window_budget}s")
+        if entry["heavy_modules"]:
+            failures.append(f"{target} 启动时加载了重型模块: {', '.join(entry['heavy_modules'])}")
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for target, entry in report.items():
+            name = "桌面程序" if target == "gui" else "命令行"
+            if "skipped" in entry:
+                print(f"⏭️ {name}: 跳过 ({entry['skipped']})")
+                continue
+            line = f"⏱️ {name}: 导入 {entry['import_s'] * 1000:.0f} ms"
+            if "window_s" in entry:
+                line += f"，首个窗口 {entry['window_s'] * 1000:.0f} ms"
+            elif "window_skipped" in entry:
+                line += f"，窗口测量跳过 ({entry['window_skipped']})"
+            print(line)
+
+    for f in failures:
+        print(f"❌ {f}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""本地模拟 ckfksc 站点，用于离线测试抓取器吞吐
+
+提供 /login、/captcha、/user/game 列表页 (含 ul.pagination、mapCode 过滤) 与详情页，
+可配置比赛数量、每页条数、响应延迟、错误率和限流率。
+
+单独运行: python benchmarks/mock_server.py --port 8765 --matches 2000 --latency 0.05
+"""
+import argparse
+import io
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+root = Path(__file__).resolve().parent.parent
+sys.path.append(str(root))
+
+from src.utils.constants import OFFICIAL_MAP_ORDER
+
+TEAMS = ["红队", "蓝队"]
+
+class MockConfig:
+    def __init__(self, matches=1000, per_page=20, latency=0.02, jitter=0.5, error_rate=0.0,
+                 throttle_rate=0.0, players=8, require_login=True, seed=7):
+        self.matches = matches
+        self.per_page = per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.players = players
+        self.require_login = require_login
+        self.seed = seed
+
+def build_matches(count, start=datetime(2026, 1, 20, 23, 59)):
+    """按"每晚依官方地图顺序比赛"生成比赛列表，最新在前"""
+    matches = []
+    night = 0
+    while len(matches) < count:
+        base = start - timedelta(days=night)
+        for k, map_name in enumerate(reversed(OFFICIAL_MAP_ORDER)):
+            if len(matches) >= count:
+                break
+            matches.append({"id": 9000000 - len(matches), "map": map_name,
+                            "time": (base - timedelta(minutes=3 * k)).strftime("%m-%d %H:%M")})
+        night += 1
+    return matches
+
+def _captcha_png():
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return b"\x89PNG\r\n\x1a\n"
+    img = Image.new("RGB", (100, 36), "white")
+    ImageDraw.Draw(img).text((20, 10), "8K3D", fill="black")
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockCkfksc/1.0"
+    # 保持长连接，与真实站点一致
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    @property
+    def cfg(self):
+        return self.server.cfg
+
+    def _send(self, body, ctype="text/html; charset=utf-8", status=200, headers=None):
+        data = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay_and_fail(self):
+        """模拟网络延迟与服务端错误，返回 True 表示本次请求已用错误响应结束"""
+        cfg = self.cfg
+        if cfg.latency:
+            time.sleep(max(0.0, random.uniform(1 - cfg.jitter, 1 + cfg.jitter) * cfg.latency))
+        r = random.random()
+        if r < cfg.throttle_rate:
+            self._send("Too Many Requests", status=429, headers={"Retry-After": "1"})
+            return True
+        if r < cfg.throttle_rate + cfg.error_rate:
+            self._send("Internal Server Error", status=500)
+            return True
+        return False
+
+    def _logged_in(self):
+        return not self.cfg.require_login or "MOCKSESSION=ok" in (self.headers.get("Cookie") or "")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/login":
+            return self._send("<html><body><form id='login'></form></body></html>")
+        if url.path == "/captcha":
+            return self._send(self.server.captcha, "image/png")
+        if not self._logged_in():
+            return self._send("", status=302, headers={"Location": "/login"})
+        if self._delay_and_fail():
+            return
+        if url.path == "/user/game":
+            page = int(query.get("pageNum", ["1"])[0] or 1)
+            return self._send(self.server.list_page(page, query.get("mapCode", [""])[0]))
+        if url.path == "/user/game/detail":
+            return self._send(self.server.detail_page(int(query.get("gameId", ["0"])[0])))
+        self._send("Not Found", status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        body = json.dumps({"respCo": "0000", "respMsg": "成功"})
+        self._send(body, "application/json", headers={"Set-Cookie": "MOCKSESSION=ok; Path=/"})
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, cfg, host="127.0.0.1", port=0):
+        super().__init__((host, port), MockHandler)
+        self.cfg = cfg
+        random.seed(cfg.seed)
+        self.matches = build_matches(cfg.matches)
+        self.by_id = {m["id"]: m for m in self.matches}
+        self.captcha = _captcha_png()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def list_page(self, page, map_code):
+        ms = [m for m in self.matches if not map_code or m["map"] == map_code]
+        per = self.cfg.per_page
+        chunk = ms[(page - 1) * per: page * per]
+        if chunk:
+            rows = "".join(
+                f"<tr><td>组队竞速</td><td>{m['map']}</td><td>{self.cfg.players}</td><td>红队</td>"
+                f"<td>30</td><td>10</td><td>{m['time']}</td>"
+                f"<td><a href=\"/user/game/detail?gameId={m['id']}\" class=\"btn btn-xs\">详情</a></td></tr>"
+                for m in chunk)
+        else:
+            rows = "<tr><td colspan=\"8\">没有对局记录</td></tr>"
+        nxt = f"<li><a href=\"?pageNum={page + 1}\">&raquo;</a></li>" if page * per < len(ms) else ""
+        return ("<html><body><table class=\"table table-striped\"><thead><tr><th>模式</th><th>地图</th>"
+                "<th>人数</th><th>胜方</th><th>经验</th><th>金币</th><th>开始时间</th><th>操作</th></tr></thead>"
+                f"<tbody>{rows}</tbody></table><ul class=\"pagination\"><li class=\"active\"><a>{page}</a></li>{nxt}</ul>"
+                "</body></html>")
+
+    def detail_page(self, game_id):
+        rnd = random.Random(game_id)
+        rows = "".join(
+            f"<tr><td>选手{rnd.randint(1, 30):02d}&nbsp;</td><td>黑武士</td><td>{TEAMS[k % 2]}</td><td>{k + 1}</td>"
+            f"<td>01:{30 + k:02d}.{rnd.randint(0, 99):02d}</td><td>{40 - k * 3}</td><td>{20 - k}</td></tr>"
+            for k in range(self.cfg.players))
+        return ("<html><body><table class=\"table table-bordered\"><thead><tr><th>角色</th><th>车辆</th><th>队伍</th>"
+                "<th>排名</th><th>成绩</th><th>经验</th><th>金币</th></tr></thead>"
+                f"<tbody>{rows}</tbody></table></body></html>")
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟 ckfksc 站点")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--matches", type=int, default=1000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    cfg = MockConfig(matches=args.matches, per_page=args.per_page, latency=args.latency,
+                     error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    server = MockServer(cfg, port=args.port)
+    print(f"READY {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
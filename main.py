@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import os
 from pathlib import Path
@@ -14,6 +15,8 @@ def ensure_dirs():
     get_config_dir().mkdir(parents=True, exist_ok=True)
 
 if __name__ == "__main__":
+    # 打包后的 exe 中启动抓取工作进程需要
+    multiprocessing.freeze_support()
     ensure_dirs()
     app = App()
     app.mainloop()
@@ -0,0 +1,243 @@
+"""命令行入口：无需图形界面，适合在服务器或计划任务中批量抓取并生成报表
+
+    python -m src.cli crawl --mode 组队竞速 --mode 组队道具 --start-map 绿色山谷
+    python -m src.cli crawl --mode 组队竞速 --stage 第一阶段 --since "2026-01-20 20:00"
+    python -m src.cli report data/01-20_组队竞速.csv data/01-21_组队竞速.csv
+    python -m src.cli report --season --mode 组队竞速 --from 2026-01-01 --to 2026-01-31
+    python -m src.cli report --store --mode 组队竞速 --from 2026-01-20
+    python -m src.cli run jobs.json
+
+jobs.json 为任务列表，每项的键为对应命令的参数名 (argparse 的 dest，如 start_maps、date_from)，例如
+    [{"command": "crawl", "mode": ["组队竞速"], "incremental": true},
+     {"command": "report", "season": true, "mode": ["组队竞速"], "date_from": "2026-01-01"}]
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from src.utils.config_manager import ConfigManager
+from src.utils.paths import get_config_dir, get_data_dir
+
+def log(msg):
+    print(msg, flush=True)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="疯狂赛车比赛数据抓取与报表 (命令行)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    crawl = sub.add_parser("crawl", help="登录并抓取比赛，写入 CSV 与本地比赛库，默认随后生成报表")
+    crawl.add_argument("--mode", action="append", help="游戏模式，可重复指定多个 (并发抓取)；默认取配置中的模式")
+    crawl.add_argument("--start-map", action="append", dest="start_maps",
+                       help="起始地图 (最旧)：抓取到该地图为止 (触发停止)，可重复指定")
+    crawl.add_argument("--end-map", default=None, help="结束地图 (最新)：从该地图开始记录 (触发开始)，默认直接开始")
+    crawl.add_argument("--stage", help="只抓取配置中该阶段的地图 (按地图查询)")
+    crawl.add_argument("--since", help="按阶段抓取时的最早开始时间，如 \"2026-01-20 20:00\"")
+    crawl.add_argument("--incremental", action="store_true", help="增量抓取，到上次抓取过的比赛为止")
+    crawl.add_argument("--account", help="使用的账号 (手机号)，默认当前账号")
+    crawl.add_argument("--workers", type=int, default=20, help="最大并发请求数")
+    crawl.add_argument("--output", help="CSV 与报表输出目录，默认 data/")
+    crawl.add_argument("--no-report", action="store_true", help="只抓取，不生成报表")
+
+    report = sub.add_parser("report", help="由已有的 CSV/XLSX 或本地比赛库生成报表")
+    report.add_argument("files", nargs="*", help="数据文件，每个文件生成一份报表 (--season 时合并为一份)")
+    report.add_argument("--season", action="store_true", help="合并为赛季报表 (含每晚战况)")
+    report.add_argument("--store", action="store_true", help="直接查询本地比赛库生成报表")
+    report.add_argument("--mode", action="append", help="按模式筛选 (--season 不指定文件时 / --store)")
+    report.add_argument("--from", dest="date_from", help="起始日期 YYYY-MM-DD")
+    report.add_argument("--to", dest="date_to", help="结束日期 YYYY-MM-DD")
+    report.add_argument("--stage", help="--store 时只统计该阶段的地图")
+    report.add_argument("--jobs", type=int, default=None, help="赛季报表并行进程数，默认 CPU 核数")
+    report.add_argument("--output", help="报表输出目录，默认 data/")
+
+    run = sub.add_parser("run", help="按 JSON 任务列表依次执行多个任务")
+    run.add_argument("jobs_file", help="任务列表文件")
+    return parser
+
+def find_stage(config, name):
+    stage = next((p for p in config.get("custom_pages", []) if p.get("name") == name), None)
+    if stage is None:
+        raise SystemExit(f"❌ 配置中没有名为 {name} 的阶段")
+    return stage
+
+def get_account(config, phone=None):
+    if phone is None:
+        return config.get_current_account()
+    for i, acc in enumerate(config.get("accounts", [])):
+        if acc.get("phone") == phone:
+            config.config["current_account_idx"] = i
+            return config.get_current_account()
+    return None
+
+def run_crawl(args, config):
+    from src.core.captcha import warm_up
+    from src.core.match_store import MatchStore
+    from src.core.orchestrator import CrawlOrchestrator
+    from src.core.record_sink import CsvSink, StoreSink, TeeSink
+    from src.core.scraper import CrazyCarScraper
+
+    acc = get_account(config, args.account)
+    if not acc:
+        log("❌ 未配置账号，请先在图形界面中添加账号")
+        return 1
+    # 验证码模型与会话恢复、登录页请求并行加载
+    warm_up()
+
+    game = config.get("game_settings", {})
+    modes = args.mode or [game.get("mode", "组队竞速")]
+    start_maps = args.start_maps or game.get("start_maps", ["绿色山谷"])
+    end_map = args.end_map if args.end_map is not None else game.get("end_map", "")
+    sub_map = config.get("substitution_map", {})
+    output_dir = Path(args.output) if args.output else get_data_dir()
+    stage = find_stage(config, args.stage) if args.stage else None
+    since = datetime.fromisoformat(args.since) if args.since else None
+
+    scraper = CrazyCarScraper(acc["phone"], acc["password"], log, max_workers=args.workers)
+    if not scraper.login():
+        log("❌ 登录失败，终止任务")
+        return 1
+
+    store = MatchStore()
+    sinks = {}
+
+    def sink_factory(mode):
+        sinks[mode] = TeeSink(CsvSink(output_dir, log), StoreSink(store))
+        return sinks[mode]
+
+    orchestrator = CrawlOrchestrator(scraper)
+    stopped = threading.Event()
+    # 每个模式抓取结束时的统计快照：按阶段逐个模式抓取时每次开始都会重置统计，多模式并发时统计在各个分身中
+    metrics = {}
+
+    def crawl():
+        if stage:
+            maps = scraper.maps_in_stage(stage)
+            for mode in modes:
+                if stopped.is_set():
+                    break
+                scraper.start_crawl_maps(mode, maps, sub_map, since=since, sink=sink_factory(mode))
+                metrics[mode] = scraper.metrics.snapshot()
+        elif len(modes) == 1:
+            scraper.start_crawl(modes[0], start_maps, end_map, sub_map,
+                                incremental=args.incremental, sink=sink_factory(modes[0]))
+            metrics[modes[0]] = scraper.metrics.snapshot()
+        else:
+            results = orchestrator.run(modes, start_maps, end_map, sub_map,
+                                       incremental=args.incremental, sink_factory=sink_factory)
+            metrics.update((mode, result[3]) for mode, result in results.items())
+
+    # 抓取放在后台线程，主线程留给 Ctrl+C：中断时取消抓取并保留已抓到的部分
+    thread = threading.Thread(target=crawl, daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    except KeyboardInterrupt:
+        stopped.set()
+        scraper.stop()
+        orchestrator.stop()
+        thread.join()
+
+    csv_paths = []
+    try:
+        for mode, sink in sinks.items():
+            csv_path, added = sink.close()
+            log(f"🗄️ [{mode}] 本地比赛库新增 {added} 条成绩记录")
+            if csv_path:
+                csv_paths.append(csv_path)
+                scraper.write_metrics(csv_path, metrics.get(mode))
+    finally:
+        store.close()
+
+    if not csv_paths:
+        log("❌ 未抓取到数据或保存失败")
+        return 1
+    if args.no_report:
+        return 0
+
+    from src.core.report_gen import ReportGenerator
+    gen = ReportGenerator()
+    ok = True
+    for csv_path in csv_paths:
+        report_path = gen.generate_report(csv_path, sub_map, config.get("custom_pages", []), output_dir)
+        if report_path:
+            log(f"✅ 报表生成成功: {report_path}")
+        else:
+            log(f"❌ 报表生成失败: {csv_path}")
+            ok = False
+    return 0 if ok else 1
+
+def run_report(args, config):
+    from src.core.report_gen import ReportGenerator
+
+    sub_map = config.get("substitution_map", {})
+    custom_pages = config.get("custom_pages", [])
+    output_dir = Path(args.output) if args.output else get_data_dir()
+    gen = ReportGenerator()
+    # 按模式筛选时每个模式各出一份报表
+    modes = args.mode or [None]
+
+    if args.store:
+        from src.core.match_store import MatchStore
+        maps = None
+        if args.stage:
+            from src.core.scraper import CrazyCarScraper
+            maps = CrazyCarScraper.maps_in_stage(find_stage(config, args.stage))
+        store = MatchStore()
+        try:
+            paths = [gen.generate_report_from_store(store, sub_map, custom_pages, output_dir, mode=mode,
+                                                    date_from=args.date_from, date_to=args.date_to, maps=maps)
+                     for mode in modes]
+        finally:
+            store.close()
+    elif args.season:
+        paths = [gen.generate_season_report(sub_map, custom_pages, output_dir, files=args.files or None,
+                                            mode=mode, date_from=args.date_from, date_to=args.date_to,
+                                            max_workers=args.jobs)
+                 for mode in (modes if not args.files else [None])]
+    elif args.files:
+        paths = [gen.generate_report(f, sub_map, custom_pages, output_dir) for f in args.files]
+    else:
+        log("❌ 请指定数据文件，或使用 --season / --store")
+        return 1
+
+    for p in paths:
+        log(f"✅ 报表生成成功: {p}" if p else "❌ 报表生成失败")
+    return 0 if all(paths) else 1
+
+def run_jobs(args, config):
+    with open(args.jobs_file, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+
+    parser = build_parser()
+    status = 0
+    for i, job in enumerate(jobs, 1):
+        job = dict(job)
+        command = job.pop("command", None)
+        if command not in ("crawl", "report"):
+            log(f"❌ 任务 {i}: 未知命令 {command}")
+            status = 1
+            continue
+        # 以命令行默认值为底，再覆盖任务中给出的参数
+        job_args = parser.parse_args([command])
+        for key, value in job.items():
+            if key in ("mode", "start_maps", "files") and isinstance(value, str):
+                value = [value]
+            setattr(job_args, key, value)
+        log(f"\n▶️ 任务 {i}/{len(jobs)}: {command}")
+        status |= COMMANDS[command](job_args, config)
+    return status
+
+COMMANDS = {"crawl": run_crawl, "report": run_report, "run": run_jobs}
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    get_data_dir().mkdir(parents=True, exist_ok=True)
+    get_config_dir().mkdir(parents=True, exist_ok=True)
+    return COMMANDS[args.command](args, ConfigManager())
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import threading
+
+class CaptchaSolver:
+    """进程内共享的验证码识别器：ddddocr 模型只加载一次，可在程序启动时于后台线程预热
+
+    同一进程中的所有 CrazyCarScraper 实例 (工作进程中的抓取与多模式分身、界面进程中账号页的测试登录) 共用同一个模型；
+    没有预热时在第一次识别验证码时加载。
+    """
+
+    def __init__(self):
+        self._model = None
+        self._error = None
+        self._ready = threading.Event()
+        self._load_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._loading = False
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def warm_up(self):
+        """在后台线程加载模型 (重复调用无副作用)，不阻塞调用方 (如界面线程)"""
+        with self._load_lock:
+            if self._loading or self._ready.is_set():
+                return
+            self._loading = True
+        threading.Thread(target=self._load, name="captcha-warmup", daemon=True).start()
+
+    def _load(self):
+        try:
+            import ddddocr
+            self._model = ddddocr.DdddOcr(show_ad=False)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    def _ensure_loaded(self):
+        if not self._ready.is_set():
+            with self._load_lock:
+                # 没有预热过则在当前 (后台) 线程同步加载
+                start_here = not self._loading
+                self._loading = True
+            if start_here:
+                self._load()
+            self._ready.wait()
+        if self._model is None:
+            error = self._error
+            # 允许下次登录时重新加载
+            with self._load_lock:
+                self._loading = False
+                self._ready.clear()
+            raise RuntimeError(f"验证码识别模型加载失败: {error}")
+
+    def classification(self, image):
+        """识别验证码图片 (bytes)；模型仍在预热时等待其加载完成"""
+        self._ensure_loaded()
+        with self._run_lock:
+            return self._model.classification(image)
+
+_solver = CaptchaSolver()
+
+def get_solver():
+    return _solver
+
+def warm_up():
+    _solver.warm_up()
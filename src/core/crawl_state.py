@@ -0,0 +1,53 @@
+import json
+import os
+import threading
+from pathlib import Path
+from src.utils.paths import get_cache_dir
+
+class CrawlStateStore:
+    """增量抓取水位：按账号 + 模式记录已抓取比赛的索引 (最新在前)，索引第一条即水位"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None, max_matches=5000):
+        self.path = Path(path) if path else get_cache_dir() / "crawl_state.json"
+        self.max_matches = max_matches
+
+    @staticmethod
+    def _key(username, game_type_id):
+        return f"{username}:{game_type_id}"
+
+    def _read(self):
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, username, game_type_id):
+        """返回 [(summary, detail_url), ...]，按开始时间从新到旧"""
+        with self._lock:
+            entry = self._read().get(self._key(username, game_type_id), {})
+        return [(m[0], m[1]) for m in entry.get("matches", [])]
+
+    def save(self, username, game_type_id, matches):
+        with self._lock:
+            state = self._read()
+            state[self._key(username, game_type_id)] = {
+                "watermark": matches[0][1] if matches else "",
+                "matches": [[s, u] for s, u in matches[:self.max_matches]],
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def reset(self, username, game_type_id):
+        with self._lock:
+            state = self._read()
+            if state.pop(self._key(username, game_type_id), None) is not None:
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(state, f, ensure_ascii=False)
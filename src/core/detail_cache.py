@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from src.utils.paths import get_cache_dir
+
+class DetailCache:
+    """比赛详情缓存：已结束的比赛详情不会再变，按详情URL的哈希保存解析后的表头与数据行"""
+
+    def __init__(self, cache_dir=None, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir() / "details"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def _path(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def get(self, url):
+        """返回 (header, rows)，未命中返回 None"""
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("url") != url:
+                return None
+            # 刷新访问时间，淘汰时按最近使用排序
+            os.utime(path, None)
+            return entry.get("header"), entry.get("rows", [])
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, header, rows):
+        path = self._path(url)
+        data = json.dumps({"url": url, "header": header, "rows": rows}, ensure_ascii=False).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            old_size = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan_size(self):
+        if not self.cache_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*/*.json"))
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到占用降到上限的 90%"""
+        files = []
+        for p in self.cache_dir.glob("*/*.json"):
+            try:
+                st = p.stat()
+                files.append((st.st_mtime, st.st_size, p))
+            except OSError:
+                continue
+        files.sort()
+
+        total = sum(f[1] for f in files)
+        target = self.max_bytes * 0.9
+        for _, size, p in files:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def clear(self):
+        with self._lock:
+            for p in self.cache_dir.glob("*/*.json"):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            self._total_bytes = 0
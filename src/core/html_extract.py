@@ -0,0 +1,110 @@
+import re
+from collections import namedtuple
+from html import unescape
+
+# 列表页/详情页只需要 table.table 中的单元格、"详情" 链接以及分页信息，
+# 这里用预编译正则直接切片提取，不构建整棵 DOM；结构异常时回退到 BeautifulSoup。
+ParsedPage = namedtuple("ParsedPage", ["header", "rows", "links", "has_next"])
+
+_TABLE_RE = re.compile(
+    r"<table\b[^>]*\bclass\s*=\s*[\"'](?:[^\"']*\s)?table(?:\s[^\"']*)?[\"'][^>]*>(.*?)</table\s*>",
+    re.S | re.I)
+_THEAD_RE = re.compile(r"<thead\b[^>]*>(.*?)</thead\s*>", re.S | re.I)
+_TBODY_RE = re.compile(r"<tbody\b[^>]*>(.*?)</tbody\s*>", re.S | re.I)
+_TR_RE = re.compile(r"<tr\b[^>]*>(.*?)(?:</tr\s*>|(?=<tr\b)|$)", re.S | re.I)
+_TD_RE = re.compile(r"<td\b[^>]*>(.*?)(?:</td\s*>|(?=<t[dh]\b)|$)", re.S | re.I)
+_TH_RE = re.compile(r"<th\b[^>]*>(.*?)(?:</th\s*>|(?=<t[dh]\b)|$)", re.S | re.I)
+_TAG_RE = re.compile(r"<[^>]*>")
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+# 链接文字可能包在 <span> 等标签中，取出链接内容后再比较文字
+_LINK_RE = re.compile(r"<a\b([^>]*)>(.*?)</a\s*>", re.S | re.I)
+_HREF_RE = re.compile(r"\bhref\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.I)
+_PAGINATION_RE = re.compile(
+    r"<ul\b[^>]*\bclass\s*=\s*[\"'](?:[^\"']*\s)?pagination(?:\s[^\"']*)?[\"'][^>]*>(.*?)</ul\s*>",
+    re.S | re.I)
+_ACTIVE_NEXT_RE = re.compile(
+    r"<li\b[^>]*\bclass\s*=\s*[\"'](?:[^\"']*\s)?active(?:\s[^\"']*)?[\"'][^>]*>.*?</li\s*>\s*<li\b[^>]*>(.*?)</li\s*>",
+    re.S | re.I)
+
+def _text(fragment):
+    if "<" in fragment:
+        fragment = _TAG_RE.sub("", fragment)
+    if "&" in fragment:
+        fragment = unescape(fragment)
+    return fragment.strip()
+
+def _detail_href(fragment):
+    for m in _LINK_RE.finditer(fragment):
+        if _text(m.group(2)) != "详情":
+            continue
+        h = _HREF_RE.search(m.group(1))
+        if not h:
+            return None
+        return unescape(h.group(1) or h.group(2) or h.group(3) or "")
+    return None
+
+def extract_page(html):
+    """快速提取 table.table 的表头、数据行、每行的详情链接以及是否有下一页；未找到表格时返回 None"""
+    if "<!--" in html:
+        # 注释中的 <tr> 等标签不是页面内容
+        html = _COMMENT_RE.sub("", html)
+    tables = _TABLE_RE.findall(html)
+    if not tables:
+        return None
+
+    header = []
+    rows, links = [], []
+    for table in tables:
+        if not header:
+            thead = _THEAD_RE.search(table)
+            if thead:
+                tr = _TR_RE.search(thead.group(1))
+                if tr:
+                    header = [_text(c) for c in _TH_RE.findall(tr.group(1))]
+        for tbody in _TBODY_RE.findall(table):
+            for tr in _TR_RE.findall(tbody):
+                rows.append([_text(c) for c in _TD_RE.findall(tr)])
+                links.append(_detail_href(tr))
+
+    return ParsedPage(header, rows, links, _has_next(html))
+
+def _has_next(html):
+    for ul in _PAGINATION_RE.findall(html):
+        m = _ACTIVE_NEXT_RE.search(ul)
+        if m and re.search(r"<a\b", m.group(1), re.I):
+            return True
+    return False
+
+def parse_page_bs4(html):
+    """原 BeautifulSoup(html.parser) 解析路径，作为快速提取失败时的回退"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    header = []
+    h_row = soup.select_one("table.table thead tr")
+    if h_row:
+        header = [th.text.strip() for th in h_row.find_all("th")]
+
+    rows, links = [], []
+    for tr in soup.select("table.table tbody tr"):
+        rows.append([td.text.strip() for td in tr.find_all("td")])
+        dt_tag = tr.find("a", string="详情")
+        links.append(dt_tag["href"] if dt_tag and dt_tag.has_attr("href") else None)
+
+    has_next = soup.select_one("ul.pagination li.active + li a") is not None
+    return ParsedPage(header, rows, links, has_next)
+
+def _is_complete_list(page):
+    """列表页的每个数据行 ("没有对局" 提示行除外) 都应有至少 7 列和一个详情链接"""
+    return all(len(cols) >= 7 and href for cols, href in zip(page.rows, page.links)
+               if cols and "没有对局" not in cols[0])
+
+def parse_page(html, list_page=False):
+    """优先快速提取；未找到表格，或列表页 (list_page) 的数据行缺列、缺详情链接时回退到 BeautifulSoup"""
+    try:
+        page = extract_page(html)
+    except Exception:
+        page = None
+    if page is not None and (not list_page or _is_complete_list(page)):
+        return page
+    return parse_page_bs4(html)
@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+from pathlib import Path
+from src.utils.paths import get_data_dir
+from src.utils.time_utils import resolve_start_time
+from src.core.name_normalizer import get_normalizer
+from src.core.record_sink import DEFAULT_HEADER
+
+# 表头列名 -> results/matches 表字段
+_COLUMNS = {"模式": "mode", "地图": "map", "开始时间": "start_time", "角色": "role", "车辆": "car",
+            "队伍": "team", "排名": "rank", "成绩": "result", "经验": "exp", "金币": "gold"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL DEFAULT '',
+    map TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    start_ts TEXT NOT NULL,
+    UNIQUE (start_ts, map)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_mode_ts ON matches (mode, start_ts);
+CREATE INDEX IF NOT EXISTS idx_matches_map ON matches (map);
+CREATE TABLE IF NOT EXISTS results (
+    match_id INTEGER NOT NULL REFERENCES matches (id),
+    role TEXT NOT NULL,
+    car TEXT,
+    team TEXT,
+    rank INTEGER,
+    result TEXT,
+    exp TEXT,
+    gold TEXT,
+    UNIQUE (match_id, role)
+);
+"""
+
+class MatchStore:
+    """本地比赛库 (SQLite)：比赛与每位选手的成绩行，以 (开始时间, 地图, 角色) 去重，可按模式/日期/地图查询
+
+    站点的开始时间不带年份 ("01-20 22:59")，写入时按抓取时间推断年份，比赛以补全年份后的 start_ts 区分，
+    跨年后同一月日、时间、地图的比赛不会与去年的混在一起。
+
+    角色保存替换前的原始名称：不同玩家被替换成同一显示名称时不会被去重合并，修改替换表后也能重新套用，
+    查询时 (或生成报表时) 再按替换表规范化。
+    """
+
+    def __init__(self, db_path=None, reference_time=None):
+        self.db_path = Path(db_path) if db_path else get_data_dir() / "matches.db"
+        # 推断年份的参照时间，默认为写入时的当前时间
+        self.reference_time = reference_time
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._match_ids = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _match_id(self, mode, map_name, start_time):
+        if (start_time, map_name) in self._match_ids:
+            return self._match_ids[(start_time, map_name)]
+        ts = resolve_start_time(start_time, self.reference_time)
+        # 无法解析的开始时间原样保存，仍可去重
+        start_ts = ts.isoformat(sep=" ") if ts else start_time
+        self._conn.execute(
+            "INSERT OR IGNORE INTO matches (mode, map, start_time, start_ts) VALUES (?, ?, ?, ?)",
+            (mode, map_name, start_time, start_ts))
+        match_id = self._conn.execute(
+            "SELECT id FROM matches WHERE start_ts = ? AND map = ?", (start_ts, map_name)).fetchone()[0]
+        self._match_ids[(start_time, map_name)] = match_id
+        return match_id
+
+    def insert_rows(self, header, rows, commit=True):
+        """写入记录 (与 CSV 相同的表头/行格式，角色为未经替换的原始名称)，已存在的 (开始时间, 地图, 角色) 自动忽略，返回新增成绩行数"""
+        header = header or DEFAULT_HEADER
+        idx = {_COLUMNS[h]: i for i, h in enumerate(header) if h in _COLUMNS}
+
+        def col(row, name):
+            i = idx.get(name)
+            return str(row[i]).strip().lstrip("'") if i is not None and i < len(row) else ""
+
+        added = 0
+        with self._lock:
+            for row in rows:
+                start_time, map_name = col(row, "start_time"), col(row, "map")
+                if not start_time or not map_name:
+                    continue
+                match_id = self._match_id(col(row, "mode"), map_name, start_time)
+                rank = col(row, "rank")
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO results (match_id, role, car, team, rank, result, exp, gold) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (match_id, col(row, "role"), col(row, "car"), col(row, "team"),
+                     int(rank) if rank.isdigit() else None, col(row, "result"), col(row, "exp"), col(row, "gold")))
+                added += cur.rowcount
+            if commit:
+                self._conn.commit()
+        return added
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def query(self, mode=None, date_from=None, date_to=None, maps=None, substitution_map=None):
+        """按模式、日期范围 (datetime/date 或 "YYYY-MM-DD") 和地图集合查询，返回 (表头, 记录)，按开始时间从新到旧
+
+        角色为原始名称；给出 substitution_map 时替换为显示名称 (报表生成时自行规范化，无需传入)
+        """
+        where, params = [], []
+        if mode:
+            where.append("m.mode = ?")
+            params.append(mode)
+        if date_from:
+            where.append("m.start_ts >= ?")
+            params.append(str(date_from))
+        if date_to:
+            # 只给日期时包含当天全部比赛
+            date_to = str(date_to)
+            where.append("m.start_ts <= ?")
+            params.append(date_to + " 23:59:59" if len(date_to) == 10 else date_to)
+        if maps:
+            maps = list(maps)
+            where.append(f"m.map IN ({', '.join('?' * len(maps))})")
+            params.extend(maps)
+
+        sql = ("SELECT m.mode, m.map, m.start_time, r.role, r.car, r.team, r.rank, r.result, r.exp, r.gold "
+               "FROM results r JOIN matches m ON m.id = r.match_id")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.start_ts DESC, m.id, r.rank"
+
+        with self._lock:
+            rows = [list(r) for r in self._conn.execute(sql, params)]
+        if substitution_map:
+            normalize = get_normalizer(substitution_map)
+            role = DEFAULT_HEADER.index("角色")
+            for r in rows:
+                r[role] = normalize(r[role])
+        return list(DEFAULT_HEADER), rows
+
+    def export_csv(self, output_dir, filename=None, **filters):
+        from src.core.record_sink import CsvSink
+
+        header, rows = self.query(**filters)
+        if not rows:
+            return None
+        sink = CsvSink(output_dir, filename=filename)
+        sink.write(header, rows)
+        return sink.close()
+
+    def export_xlsx(self, out_path, **filters):
+        import pandas as pd
+
+        header, rows = self.query(**filters)
+        if not rows:
+            return None
+        pd.DataFrame(rows, columns=header).to_excel(out_path, index=False)
+        return Path(out_path)
@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# 抓取流程的各个阶段
+STAGES = {
+    "login": "登录",
+    "captcha_ocr": "验证码识别",
+    "list_fetch": "列表页请求",
+    "detail_fetch": "详情页请求",
+    "parse": "页面解析",
+    "substitution": "名称替换",
+    "write": "记录写出 (CSV/比赛库)",
+}
+
+class CrawlMetrics:
+    """抓取各阶段的耗时与计数器 (线程安全)，用于判断一次抓取慢在网络、解析还是验证码识别"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, keep_stages=()):
+        """清空统计；keep_stages 中的阶段 (如登录) 保留，便于同一次运行的多次抓取共享登录耗时"""
+        with self._lock:
+            old = getattr(self, "_stages", {})
+            self._stages = {k: v for k, v in old.items() if k in keep_stages}
+            self._counters = {}
+            self._started = time.time()
+
+    @contextmanager
+    def timer(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - t0)
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            st = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            st[0] += 1
+            st[1] += seconds
+            st[2] = max(st[2], seconds)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def get(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                name: {
+                    "label": STAGES.get(name, name),
+                    "count": count,
+                    "total_s": round(total, 4),
+                    "avg_ms": round(total / count * 1000, 2) if count else 0.0,
+                    "max_ms": round(longest * 1000, 2),
+                }
+                for name, (count, total, longest) in self._stages.items()
+            }
+            return {
+                "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._started)),
+                "wall_s": round(time.time() - self._started, 3),
+                "stages": stages,
+                "counters": dict(self._counters),
+            }
+
+    def write_json(self, path, snapshot=None):
+        """写出统计；snapshot 为之前取得的 snapshot() (如某个模式抓取结束时)，不指定时写出当前统计"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot or self.snapshot(), f, indent=2, ensure_ascii=False)
+        return path
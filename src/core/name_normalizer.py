@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+
+# 引用分组编号或分组名的写法 (\1、(?P=name)、(?(1)...))：拼接成一个正则后分组会重新编号，这类规则只能逐条匹配
+_GROUP_REF = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=|\(\?\(")
+
+class NameNormalizer:
+    """角色名称规范化：去掉 \\xa0 与首尾空白后按替换表映射为显示名称
+
+    替换表 (substitution_map) 的键支持三种写法：
+    - "新手o↘."：精确匹配
+    - "新手o↘.*"：前缀匹配，以该前缀开头的名称都替换
+    - "re:^\\[.+?\\](.+)$"：正则整体匹配，显示名称中可用 \\1 引用分组 (如去掉战队标签)
+    精确匹配优先；前缀与正则规则按配置顺序编译成一个正则，先写的规则优先。
+    含命名分组或分组引用的正则无法安全拼接，此时改为按配置顺序逐条匹配。
+    """
+
+    def __init__(self, substitution_map=None):
+        self.exact = {}
+        self.rules = []
+        parts = []
+        combinable = True
+        for key, value in (substitution_map or {}).items():
+            if key.startswith("re:"):
+                pattern = key[3:]
+            elif key.endswith("*") and len(key) > 1:
+                pattern = re.escape(key[:-1]) + ".*"
+            else:
+                self.exact[key] = value
+                continue
+            try:
+                rule = re.compile(pattern, re.S)
+            except re.error:
+                continue
+            self.rules.append((rule, value, key.startswith("re:")))
+            parts.append(f"(?P<r{len(self.rules) - 1}>{pattern})")
+            if rule.groupindex or _GROUP_REF.search(pattern):
+                combinable = False
+        self._matcher = None
+        if parts and combinable:
+            try:
+                self._matcher = re.compile("|".join(parts), re.S)
+            except re.error:
+                pass
+        self._memo = {}
+
+    @staticmethod
+    def clean(name):
+        return str(name).replace("\xa0", " ").strip()
+
+    def display(self, name):
+        """已清洗名称 → 显示名称"""
+        if name in self.exact:
+            return self.exact[name]
+        if self._matcher is not None:
+            m = self._matcher.fullmatch(name)
+            if m:
+                rule, value, is_regex = self.rules[int(m.lastgroup[1:])]
+                return rule.fullmatch(name).expand(value) if is_regex else value
+            return name
+        for rule, value, is_regex in self.rules:
+            m = rule.fullmatch(name)
+            if m:
+                return m.expand(value) if is_regex else value
+        return name
+
+    def __call__(self, name):
+        """原始名称 → 显示名称 (结果按原始名称缓存，同一玩家只计算一次)"""
+        try:
+            return self._memo[name]
+        except KeyError:
+            result = self._memo[name] = self.display(self.clean(name))
+            return result
+
+    def normalize_column(self, values):
+        """对整列名称去重后规范化，返回 (清洗后的名称, 显示名称) 两个 object 数组；缺失值与 astype(str) 一样记为 "nan" """
+        import numpy as np
+        import pandas as pd
+
+        codes, uniques = pd.factorize(values)
+        names = [self.clean(x) for x in uniques] + ["nan"]
+        display = [self.display(x) for x in names]
+        return np.array(names, dtype=object)[codes], np.array(display, dtype=object)[codes]
+
+def get_normalizer(substitution_map):
+    """同一替换表复用已编译的规范化器"""
+    return _cached_normalizer(tuple((substitution_map or {}).items()))
+
+@lru_cache(maxsize=8)
+def _cached_normalizer(items):
+    return NameNormalizer(dict(items))
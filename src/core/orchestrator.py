@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.core.record_sink import ListSink
+
+class CrawlOrchestrator:
+    """多模式并发抓取：所有模式共享同一个已登录的会话和全局并发预算 (同一个 AdaptiveLimiter)，
+    每个模式各自输出一份数据，总耗时约等于最慢的那个模式"""
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def run(self, modes, start_maps, end_map, substitution_map=None, incremental=False, sink_factory=None):
+        """返回 {模式: (header, records, sink, metrics)}；sink_factory(mode) 可为每个模式提供独立的 sink
+
+        metrics 为该模式的分身抓取结束时的统计快照 (CrawlMetrics.snapshot())，各模式的统计互不相同。
+        """
+        modes = list(dict.fromkeys(modes))
+        self.scraper.log(f"🧭 多模式并发抓取: {modes}")
+
+        def crawl(mode):
+            worker = self.scraper.fork(log_prefix=f"[{mode}] ")
+            with self._lock:
+                self._workers.append(worker)
+            # 分身登记前已请求停止时 stop() 遍历不到它，这里补上
+            if self.scraper.cancelled:
+                worker.stop()
+            sink = sink_factory(mode) if sink_factory else ListSink()
+            header, records = worker.start_crawl(mode, start_maps, end_map, substitution_map,
+                                                 incremental=incremental, sink=sink)
+            return header, records, sink, worker.metrics.snapshot()
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(modes) or 1) as executor:
+            futures = {mode: executor.submit(crawl, mode) for mode in modes}
+            for mode, future in futures.items():
+                try:
+                    results[mode] = future.result()
+                except Exception as e:
+                    self.scraper.log(f"❌ [{mode}] 抓取异常: {e}")
+
+        with self._lock:
+            self._workers = []
+        return results
+
+    def stop(self):
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
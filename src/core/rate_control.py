@@ -0,0 +1,81 @@
+import random
+import threading
+import time
+
+class AdaptiveLimiter:
+    """AIMD 并发控制：请求成功时缓慢增加并发上限，遇到限流、错误或延迟飙升时成倍收缩"""
+
+    def __init__(self, initial=4, min_limit=1, max_limit=20, backoff_ratio=0.5, latency_factor=3.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_factor = latency_factor
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._ewma_latency = None
+        self._base_latency = None
+        self._last_decrease = 0.0
+        self._cooldown_until = 0.0
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self, abort_event=None):
+        """等待一个并发槽位；abort_event 被设置时放弃等待并返回 False"""
+        with self._cond:
+            while True:
+                if abort_event is not None and abort_event.is_set():
+                    return False
+                wait = self._cooldown_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(min(wait, 0.1) if abort_event is not None else wait)
+                elif self._in_flight >= int(self.limit):
+                    self._cond.wait(0.1 if abort_event is not None else None)
+                else:
+                    break
+            self._in_flight += 1
+            return True
+
+    def release(self, latency=None, ok=True, throttled=False, retry_after=None):
+        """归还并发槽位，并根据本次请求的结果调整上限"""
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+
+            if throttled or not ok:
+                if throttled:
+                    # 被限流时所有请求暂停一段时间，优先遵守服务端的 Retry-After
+                    pause = retry_after if retry_after else min(5.0, (self._ewma_latency or 1.0) * 2)
+                    self._cooldown_until = max(self._cooldown_until, now + pause)
+                self._decrease(now, self.backoff_ratio)
+            elif latency is not None:
+                if self._ewma_latency is None:
+                    self._ewma_latency = latency
+                else:
+                    self._ewma_latency = 0.8 * self._ewma_latency + 0.2 * latency
+                if self._base_latency is None or self._ewma_latency < self._base_latency:
+                    self._base_latency = self._ewma_latency
+
+                if self._ewma_latency > self._base_latency * self.latency_factor:
+                    # 延迟明显高于基线，说明服务端开始排队，轻微收缩
+                    self._decrease(now, 0.8)
+                else:
+                    # 每轮 (约 limit 个请求) 增加 1 个并发
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+            self._cond.notify_all()
+
+    def _decrease(self, now, ratio):
+        # 同一批并发请求的失败只收缩一次，避免上限瞬间降到底
+        window = self._ewma_latency or 1.0
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * ratio)
+
+def backoff_delay(attempt, base=0.5, cap=10.0):
+    """带抖动的指数退避 (full jitter)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
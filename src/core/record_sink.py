@@ -0,0 +1,145 @@
+import csv
+import os
+
+# sink 接口：write(header, rows, raw_rows=None) / flush() / close()
+# rows 为名称替换后的记录；raw_rows 为替换前的原始记录，只有需要原始角色名的 sink (本地比赛库) 使用
+
+DEFAULT_HEADER = ["模式", "地图", "开始时间", "角色", "车辆", "队伍", "排名", "成绩", "经验", "金币"]
+
+class ListSink:
+    """内存收集器：保留原先一次性返回全部记录的行为"""
+
+    def __init__(self):
+        self.header = None
+        self.records = []
+        self.count = 0
+
+    def write(self, header, rows, raw_rows=None):
+        if header and not self.header:
+            self.header = header
+        for row in rows:
+            self.records.append(row)
+            self.count += 1
+
+    def flush(self):
+        pass
+
+    def close(self):
+        return self.records
+
+class CsvSink:
+    """边抓取边写 CSV：首条记录到达时按 {日期}_{模式}.csv 建文件，之后逐行追加，按页刷新到磁盘，
+    中途崩溃或停止时已写入的部分仍然保留"""
+
+    def __init__(self, output_dir, log_callback=None, filename=None):
+        self.output_dir = str(output_dir)
+        self.log_callback = log_callback
+        self.filename = filename
+        self.header = None
+        self.records = []  # 流式写出，不在内存中保留记录
+        self.count = 0
+        self.path = None
+        self._file = None
+        self._writer = None
+        self._s_idx = -1
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            print(message)
+
+    def _open(self, header, first):
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+        if self.filename:
+            self.path = os.path.join(self.output_dir, self.filename)
+        else:
+            mode = first[0] if first else "未知"
+            date_str = first[2].split()[0] if len(first) > 2 else "00-00"
+            # 同一天同一模式抓取多次时不覆盖之前的文件
+            self.path = os.path.join(self.output_dir, f"{date_str}_{mode}.csv")
+            n = 2
+            while os.path.exists(self.path):
+                self.path = os.path.join(self.output_dir, f"{date_str}_{mode}_{n}.csv")
+                n += 1
+        self.header = header or DEFAULT_HEADER
+        self._file = open(self.path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header)
+        self._s_idx = self.header.index("成绩") if "成绩" in self.header else -1
+
+    def write(self, header, rows, raw_rows=None):
+        for row in rows:
+            if self._writer is None:
+                self._open(header, row)
+            r = [str(x) for x in row]
+            # 成绩形如 01:23.45，加前缀避免被 Excel 识别成时间
+            if self._s_idx != -1 and self._s_idx < len(r) and ":" in r[self._s_idx]:
+                r[self._s_idx] = f"'{r[self._s_idx]}"
+            self._writer.writerow(r)
+            self.count += 1
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        """关闭文件并返回路径，没有任何记录时返回 None"""
+        if self._file:
+            self._file.close()
+            self._file = None
+            self.log(f"✅ CSV保存成功: {os.path.basename(self.path)}")
+        return self.path
+
+class StoreSink:
+    """写入本地比赛库 (MatchStore)，重复的比赛/成绩行自动去重，每页提交一次事务
+
+    比赛库保存原始角色名：写入方提供 raw_rows (名称替换前的记录) 时写入 raw_rows。
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.header = None
+        self.records = []
+        self.count = 0
+        self.added = 0
+
+    def write(self, header, rows, raw_rows=None):
+        if header and not self.header:
+            self.header = header
+        rows = list(rows if raw_rows is None else raw_rows)
+        self.added += self.store.insert_rows(self.header, rows, commit=False)
+        self.count += len(rows)
+
+    def flush(self):
+        self.store.commit()
+
+    def close(self):
+        self.store.commit()
+        return self.added
+
+class TeeSink:
+    """同时写入多个 sink，例如 CSV 导出 + 本地比赛库"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+        self.header = None
+        self.records = []
+        self.count = 0
+
+    def write(self, header, rows, raw_rows=None):
+        if header and not self.header:
+            self.header = header
+        rows = list(rows)
+        for sink in self.sinks:
+            sink.write(header, rows, raw_rows=raw_rows)
+        self.count += len(rows)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        return [sink.close() for sink in self.sinks]
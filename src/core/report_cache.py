@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+from src.utils.paths import get_cache_dir
+
+class ReportCache:
+    """报表产物缓存：按 (输入数据, 替换表, 阶段配置, 模板版本) 的哈希保存聚合结果与已生成的报表
+
+    - {key}.pkl：某份输入数据的聚合结果 (与阶段配置、模板无关，可复用来重新渲染)
+    - {key}.json：某次渲染生成的报表路径，输入未变化时直接返回
+    """
+
+    def __init__(self, cache_dir=None, max_entries=100):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir() / "reports"
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts):
+        data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def file_digest(path, block_size=1024 * 1024):
+        """按文件内容计算哈希 (分块读取)，文件被重新导出但内容相同时仍能命中"""
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def get_aggregates(self, key):
+        path = self.cache_dir / f"{key}.pkl"
+        try:
+            with open(path, "rb") as f:
+                aggs = pickle.load(f)
+            os.utime(path, None)
+            return aggs
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def put_aggregates(self, key, aggs):
+        self._write(self.cache_dir / f"{key}.pkl", pickle.dumps(aggs, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def get_report(self, key):
+        """返回仍然存在的报表路径，未命中返回 None"""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                report = Path(json.load(f)["path"])
+        except (OSError, ValueError, KeyError):
+            return None
+        if not report.exists():
+            return None
+        os.utime(path, None)
+        return report
+
+    def put_report(self, key, report_path):
+        data = json.dumps({"path": str(report_path)}, ensure_ascii=False).encode("utf-8")
+        self._write(self.cache_dir / f"{key}.json", data)
+
+    def _write(self, path, data):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """聚合结果与报表记录各保留最近使用的 max_entries 个；只删除缓存记录，报表文件仍保留在历史记录中"""
+        for pattern in ("*.pkl", "*.json"):
+            entries = []
+            for p in self.cache_dir.glob(pattern):
+                try:
+                    entries.append((p.stat().st_mtime, p))
+                except OSError:
+                    continue
+            if len(entries) <= self.max_entries:
+                continue
+            entries.sort()
+            for _, p in entries[:len(entries) - self.max_entries]:
+                p.unlink(missing_ok=True)
+
+    def clear(self):
+        with self._lock:
+            for p in list(self.cache_dir.glob("*.pkl")) + list(self.cache_dir.glob("*.json")):
+                p.unlink(missing_ok=True)
@@ -1,10 +1,42 @@
+import numpy as np
 import pandas as pd
+import csv
 import json
 import logging
+import os
+import re
 import time
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from src.utils.paths import get_assets_dir
+from src.core.name_normalizer import get_normalizer
+from src.core.report_cache import ReportCache
+from src.core.template_engine import load_template
+from src.utils.paths import get_assets_dir, get_data_dir
+
+try:
+    import pyarrow  # noqa: F401  可选依赖：安装后用多线程的 pyarrow 引擎读取 CSV
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# 读取时直接指定类型：重复度高的文本列用 category，时间与成绩保持原文本
+CATEGORY_COLUMNS = ("角色", "地图", "队伍", "车辆", "模式")
+TEXT_COLUMNS = ("开始时间", "成绩")
+
+# 超过该大小的文件自动按批聚合
+CHUNK_THRESHOLD_BYTES = 512 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 200_000
+
+# 聚合逻辑变化时递增，使旧的缓存聚合结果失效
+AGGREGATE_VERSION = 1
+
+# 抓取导出的文件名：{月-日}_{模式}.csv，同日重复抓取带 _2、_3 后缀
+EXPORT_NAME = re.compile(r"^(\d{2}-\d{2})_(.+?)(?:_\d+)?\.(?:csv|xlsx)$")
+
+# 同一晚重复抓取的多个文件合并时按这些列去重 (同名玩家的排名不同，不会被误删)
+DEDUP_COLUMNS = ["开始时间", "地图", "角色", "排名"]
 
 # Set up logging to use a null handler by default, or just let the caller handle logging config
 logger = logging.getLogger(__name__)
@@ -23,98 +55,442 @@ OFFICIAL_MAP_ORDER = [
 ]
 
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, use_cache=True):
         self.default_year = 2026
         self.template_path = get_assets_dir() / "report_template.html"
+        self.cache = ReportCache() if use_cache else None
         
     def load_template(self):
-        if not self.template_path.exists():
-            raise FileNotFoundError(f"Template not found at {self.template_path}")
-        with open(self.template_path, "r", encoding="utf-8") as f:
-            return f.read()
+        """返回编译后的报表模板 (进程内缓存)"""
+        return load_template(self.template_path)
 
     def process_dataframe(self, file_path, sub_map):
         try:
             file_path = Path(file_path)
             if file_path.suffix.lower() == '.xlsx':
-                df = pd.read_excel(file_path)
+                df = self.read_xlsx(file_path)
             else:
-                df = pd.read_csv(file_path, encoding='utf-8-sig')
-
-            df.columns = df.columns.str.strip()
-            if "角色" not in df.columns:
-                if file_path.suffix.lower() == '.xlsx':
-                    df = pd.read_excel(file_path, header=1)
-                else:
-                    df = pd.read_csv(file_path, encoding='utf-8-sig', header=1)
-                df.columns = df.columns.str.strip()
-
-            df["角色"] = df["角色"].astype(str).str.replace(r"\xa0", " ", regex=True).str.strip()
-            df["显示名称"] = df["角色"].map(lambda x: sub_map.get(x, x))
-
-            score_map = {1: 10, 2: 8, 3: 6, 4: 5, 5: 4, 6: 3, 7: 2, 8: 1}
-            df["得分"] = df["排名"].map(score_map).fillna(0).astype(int)
-            df.loc[df["成绩"].astype(str).str.contains("未完成|00:00|0-1"), "得分"] = 0
-            return df
+                df = self.read_csv(file_path)
+            return self.prepare_dataframe(df, sub_map)
         except Exception as e:
             logger.error(f"处理数据出错: {e}")
             return None
 
-    def generate_report(self, target_file, sub_map, custom_pages, output_dir):
-        output_dir = Path(output_dir)
-        if not output_dir.exists():
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
+    @staticmethod
+    def sniff_header(first_rows):
+        """导出文件的表头可能在第 1 行或第 2 行 (第 1 行为标题)，返回表头所在行号"""
+        for i, row in enumerate(first_rows[:2]):
+            if "角色" in [str(c).strip() for c in row if c is not None]:
+                return i
+        return 0
+
+    def read_csv(self, file_path):
+        """只读一次文件：先嗅探表头行，再按列指定类型读取"""
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            first_rows = [row for _, row in zip(range(2), reader)]
+        header_row = self.sniff_header(first_rows)
+        raw_cols = first_rows[header_row] if len(first_rows) > header_row else []
+
+        df = pd.read_csv(file_path, encoding='utf-8-sig', header=header_row, dtype=self._csv_dtypes(raw_cols),
+                         engine=CSV_ENGINE)
+        df.columns = df.columns.str.strip()
+        return df
+
+    def read_xlsx(self, file_path):
+        """openpyxl 只读模式流式读取，不加载样式与整棵工作簿"""
+        from openpyxl import load_workbook
+
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            first_rows = [row for _, row in zip(range(2), rows)]
+            header_row = self.sniff_header(first_rows)
+            header = first_rows[header_row] if len(first_rows) > header_row else ()
+            data = first_rows[header_row + 1:] + list(rows)
+        finally:
+            wb.close()
+
+        columns = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        return self._typed_frame(data, columns)
+
+    @staticmethod
+    def _csv_dtypes(raw_cols):
+        dtype = {}
+        for c in raw_cols:
+            if c.strip() in CATEGORY_COLUMNS:
+                dtype[c] = "category"
+            elif c.strip() in TEXT_COLUMNS:
+                dtype[c] = str
+        return dtype
+
+    @staticmethod
+    def _typed_frame(rows, columns):
+        df = pd.DataFrame(rows, columns=columns)
+        for c in CATEGORY_COLUMNS:
+            if c in df.columns:
+                df[c] = df[c].astype("category")
+        return df
+
+    def prepare_dataframe(self, df, sub_map):
+        """规范角色名称并按排名计算得分"""
+        # 名称清洗与替换只在去重后的名称上做一次
+        names, display = get_normalizer(sub_map).normalize_column(df["角色"])
+        df["角色"] = pd.Categorical(names)
+        df["显示名称"] = display
+
+        # 排名统一为可空的 Int8，非数字的排名视为缺失
+        df["排名"] = pd.to_numeric(df["排名"], errors="coerce").astype("Int8")
+        score_map = {1: 10, 2: 8, 3: 6, 4: 5, 5: 4, 6: 3, 7: 2, 8: 1}
+        df["得分"] = df["排名"].map(score_map).fillna(0).astype(int)
+        df.loc[df["成绩"].astype(str).str.contains("未完成|00:00|0-1"), "得分"] = 0
+        return df
+
+    def iter_chunks(self, file_path, chunksize):
+        """按 chunksize 行分批读取 CSV/XLSX，每批都带好列类型，内存只与批大小有关"""
+        file_path = Path(file_path)
+        if file_path.suffix.lower() == '.xlsx':
+            yield from self._iter_xlsx_chunks(file_path, chunksize)
+            return
+
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            first_rows = [row for _, row in zip(range(2), csv.reader(f))]
+        header_row = self.sniff_header(first_rows)
+        raw_cols = first_rows[header_row] if len(first_rows) > header_row else []
+        # pyarrow 引擎不支持 chunksize，分批读取固定使用 C 引擎
+        with pd.read_csv(file_path, encoding='utf-8-sig', header=header_row, dtype=self._csv_dtypes(raw_cols),
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk.columns = chunk.columns.str.strip()
+                yield chunk
+
+    def _iter_xlsx_chunks(self, file_path, chunksize):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            first_rows = [row for _, row in zip(range(2), rows)]
+            header_row = self.sniff_header(first_rows)
+            header = first_rows[header_row] if len(first_rows) > header_row else ()
+            columns = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+
+            batch = list(first_rows[header_row + 1:])
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunksize:
+                    yield self._typed_frame(batch, columns)
+                    batch = []
+            if batch:
+                yield self._typed_frame(batch, columns)
+        finally:
+            wb.close()
+
+    def generate_report(self, target_file, sub_map, custom_pages, output_dir, chunksize=None):
+        """生成报表；chunksize 指定时 (或文件超过 CHUNK_THRESHOLD_BYTES) 按批流式聚合，不把整个文件载入内存"""
         target_file = Path(target_file)
         if not target_file.exists():
             logger.error(f"指定文件不存在: {target_file}")
             return None
 
         logger.info(f"正在分析文件: {target_file.name}")
-        df = self.process_dataframe(target_file, sub_map)
-        if df is None:
+        report_key = None
+        if self.cache:
+            data_key = self._data_key((target_file,), sub_map)
+            report_key = self._report_key([data_key], custom_pages, output_dir)
+            cached = self.cache.get_report(report_key)
+            if cached:
+                logger.info(f"数据与配置未变化，复用已生成的报表: {cached.name}")
+                return cached
+
+        aggs = self._load_aggregates([(target_file,)], sub_map, chunksize)[0]
+        if aggs is None:
             return None
+        out_path = self.render_report(aggs, custom_pages, output_dir)
+        if self.cache:
+            self.cache.put_report(report_key, out_path)
+        return out_path
 
-        m_date = "未知日期"
-        if "开始时间" in df.columns and not df["开始时间"].empty:
-            raw = str(df["开始时间"].iloc[0]).strip()
-            date_part = raw.split(' ')[0]
-            if len(date_part.split('-')) == 2:
-                m_date = f"{self.default_year}-{date_part}"
-            elif "/" in date_part:
-                m_date = date_part.replace("/", "-")
-            else:
-                m_date = date_part
-
-        m_mode = df["模式"].iloc[0] if "模式" in df.columns else "未知模式"
-        m_car = df["车辆"].dropna().mode()[0] if "车辆" in df.columns and not df["车辆"].dropna().empty else "未知车辆"
-
-        summary = []
-        for (t, m), g in df.groupby(["开始时间", "地图"], sort=False):
-            sc = g.groupby("队伍")["得分"].sum()
-            r, b = int(sc.get("红队", 0)), int(sc.get("蓝队", 0))
-            if r > b:
-                win = "红队"
-            elif b > r:
-                win = "蓝队"
-            else:
-                rank1 = g[g["排名"] == 1]
-                win = rank1["队伍"].iloc[0] if not rank1.empty else "红队"
-            summary.append({"map": m, "red": r, "blue": b, "win": win})
+    def _data_key(self, group, sub_map):
+        digests = [ReportCache.file_digest(f) for f in group]
+        return ReportCache.make_key("aggregates", AGGREGATE_VERSION, self.default_year,
+                                    digests[0] if len(digests) == 1 else digests, sub_map)
+
+    def _report_key(self, data_keys, custom_pages, output_dir, *extra):
+        return ReportCache.make_key("report", data_keys, custom_pages, self.load_template().digest,
+                                    str(Path(output_dir).resolve()), *extra)
+
+    def _load_aggregates(self, groups, sub_map, chunksize=None, max_workers=None):
+        """逐组 (见 group_exports) 取聚合结果：优先读缓存，其余多于一组时在进程池中并行计算"""
+        keys = [self._data_key(g, sub_map) for g in groups] if self.cache else [None] * len(groups)
+        results = [self.cache.get_aggregates(k) for k in keys] if self.cache else [None] * len(groups)
+        todo = [i for i, aggs in enumerate(results) if aggs is None]
+
+        if len(todo) <= 1 or max_workers == 1:
+            computed = [self.aggregate_paths(groups[i], sub_map, chunksize) for i in todo]
+        else:
+            workers = min(len(todo), max_workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                computed = list(executor.map(_aggregate_paths_job, [groups[i] for i in todo],
+                                             repeat(sub_map), repeat(chunksize)))
+
+        for i, aggs in zip(todo, computed):
+            results[i] = aggs
+            if self.cache and aggs is not None:
+                self.cache.put_aggregates(keys[i], aggs)
+        return results
+
+    def aggregate_path(self, file_path, sub_map, chunksize=None):
+        """读取单个文件并聚合；大文件 (或指定 chunksize) 时分批读取"""
+        if chunksize is None and Path(file_path).stat().st_size > CHUNK_THRESHOLD_BYTES:
+            chunksize = DEFAULT_CHUNK_ROWS
+        if chunksize:
+            return self.aggregate_file(file_path, sub_map, chunksize)
+        df = self.process_dataframe(file_path, sub_map)
+        return self.aggregate(df) if df is not None else None
+
+    def aggregate_paths(self, group, sub_map, chunksize=None):
+        """聚合一组文件：单个文件同 aggregate_path；同一晚重复抓取的多个文件先合并去重再聚合 (整体读入，不分批)"""
+        if len(group) == 1:
+            return self.aggregate_path(group[0], sub_map, chunksize)
+        try:
+            frames = [self.read_xlsx(f) if Path(f).suffix.lower() == '.xlsx' else self.read_csv(f) for f in group]
+            df = pd.concat(frames, ignore_index=True)
+            keys = [c for c in DEDUP_COLUMNS if c in df.columns]
+            df = df.drop_duplicates(keys, ignore_index=True) if keys else df
+            df = self.prepare_dataframe(self._typed_frame(df, df.columns), sub_map)
+        except Exception as e:
+            logger.error(f"处理数据出错: {e}")
+            return None
+        return self.aggregate(df)
 
-        r_wins_total = sum(1 for x in summary if x["win"] == "红队")
-        b_wins_total = sum(1 for x in summary if x["win"] == "蓝队")
-        r_score_total = sum(x["red"] for x in summary)
-        b_score_total = sum(x["blue"] for x in summary)
+    @staticmethod
+    def group_exports(files):
+        """按文件名把同一天同一模式的导出文件 ({月-日}_{模式}.csv 与 _2、_3 等重复抓取) 分为一组，其余文件各自一组"""
+        groups = {}
+        for f in files:
+            m = EXPORT_NAME.match(Path(f).name)
+            key = (m.group(1), m.group(2)) if m else f
+            groups.setdefault(key, []).append(f)
+        return [tuple(g) for g in groups.values()]
+
+    def find_exports(self, data_dir=None, mode=None, date_from=None, date_to=None):
+        """按文件名 ({月-日}_{模式}.csv) 在数据目录中挑选指定模式与日期范围 ("YYYY-MM-DD") 内的导出文件"""
+        data_dir = Path(data_dir) if data_dir else get_data_dir()
+        files = []
+        for path in sorted(data_dir.glob("*")):
+            m = EXPORT_NAME.match(path.name)
+            if not m or (mode and m.group(2) != mode):
+                continue
+            day = f"{self.default_year}-{m.group(1)}"
+            if (date_from and day < str(date_from)[:10]) or (date_to and day > str(date_to)[:10]):
+                continue
+            files.append(path)
+        return files
+
+    def generate_season_report(self, sub_map, custom_pages, output_dir, files=None, data_dir=None,
+                               mode=None, date_from=None, date_to=None, max_workers=None, chunksize=None):
+        """汇总多个比赛文件生成赛季报表，附每晚战况
+
+        files 不指定时按 find_exports 从数据目录挑选；各文件在进程池中并行聚合，再按日期顺序合并。
+        """
+        if files is None:
+            files = self.find_exports(data_dir, mode, date_from, date_to)
+        files = [Path(f) for f in files if Path(f).exists()]
+        if not files:
+            logger.error("没有找到符合条件的比赛文件")
+            return None
+
+        logger.info(f"正在汇总 {len(files)} 个比赛文件")
+        # 同一晚重复抓取的文件合并去重，避免重叠的比赛被重复计分
+        groups = self.group_exports(files)
+        report_key = None
+        if self.cache:
+            data_keys = [self._data_key(g, sub_map) for g in groups]
+            report_key = self._report_key(data_keys, custom_pages, output_dir, "season",
+                                          str(date_from or ""), str(date_to or ""))
+            cached = self.cache.get_report(report_key)
+            if cached:
+                logger.info(f"数据与配置未变化，复用已生成的报表: {cached.name}")
+                return cached
+
+        results = self._load_aggregates(groups, sub_map, chunksize, max_workers)
+
+        by_night = {}
+        for group, aggs in zip(groups, results):
+            if aggs is None:
+                logger.warning(f"跳过无法处理的文件: {', '.join(f.name for f in group)}")
+                continue
+            night = self.format_date(aggs["meta"]["first_time"])
+            if (date_from and night < str(date_from)[:10]) or (date_to and night > str(date_to)[:10]):
+                continue
+            by_night.setdefault(night, []).append(aggs)
+        if not by_night:
+            logger.error("没有可汇总的比赛数据")
+            return None
+
+        nights = [(night, self.merge_aggregates(parts)) for night, parts in sorted(by_night.items())]
+        season = self.merge_aggregates(aggs for _, aggs in nights)
+        title = nights[0][0] if len(nights) == 1 else f"{nights[0][0]} ~ {nights[-1][0]}"
+        out_path = self.render_report(season, custom_pages, output_dir, title=title,
+                                      nights_html=self.render_nights(nights))
+        if self.cache:
+            self.cache.put_report(report_key, out_path)
+        return out_path
+
+    def render_nights(self, nights):
+        """每晚战况表：场次、红蓝胜场与总分、当晚得分最高的选手"""
+        rows = []
+        for night, aggs in nights:
+            summary = self._match_summary(aggs["matches"])
+            r_wins = int((summary["win"] == "红队").sum())
+            b_wins = int((summary["win"] == "蓝队").sum())
+            players = aggs["players"]
+            top = players["总分"].idxmax() if not players.empty else "N/A"
+            win_cls = "bg-red" if r_wins >= b_wins else "bg-blue"
+            win_team = "红队" if r_wins >= b_wins else "蓝队"
+            rows.append(f"<tr><td>{night}</td><td>{len(summary)}</td><td>{r_wins}</td><td>{b_wins}</td>"
+                        f"<td>{int(summary['red'].sum())}</td><td>{int(summary['blue'].sum())}</td>"
+                        f"<td><span class='team-badge {win_cls}'>{win_team}</span></td>"
+                        f"<td class='player-name' title='{top}'>{top}</td></tr>")
+        return ('<div class="card chart-row"><div class="chart-header">每晚战况</div><table><thead><tr>'
+                '<th>日期</th><th>场次</th><th>红队胜</th><th>蓝队胜</th><th>红队总分</th><th>蓝队总分</th>'
+                '<th>胜方</th><th>当晚最高分</th></tr></thead><tbody>' + "".join(rows) + '</tbody></table></div>')
+
+    def aggregate_file(self, file_path, sub_map, chunksize=DEFAULT_CHUNK_ROWS):
+        """分批读取文件，每批的聚合结果随即并入累计结果，内存只与批大小和累计结果有关，不随批数增长"""
+        try:
+            merged = None
+            for chunk in self.iter_chunks(file_path, chunksize):
+                if chunk.empty:
+                    continue
+                part = self.aggregate(self.prepare_dataframe(chunk, sub_map))
+                merged = part if merged is None else self.merge_aggregates([merged, part])
+            return merged
+        except Exception as e:
+            logger.error(f"处理数据出错: {e}")
+            return None
+
+    def generate_report_from_store(self, store, sub_map, custom_pages, output_dir,
+                                   mode=None, date_from=None, date_to=None, maps=None):
+        """直接查询本地比赛库 (MatchStore) 生成报表，无需先导出 CSV"""
+        header, rows = store.query(mode=mode, date_from=date_from, date_to=date_to, maps=maps)
+        if not rows:
+            logger.error("本地比赛库中没有符合条件的比赛")
+            return None
+
+        logger.info(f"正在分析本地比赛库: {len(rows)} 条记录")
+        df = self.prepare_dataframe(pd.DataFrame(rows, columns=header), sub_map)
+        return self.build_report(df, custom_pages, output_dir)
+
+    def aggregate(self, df):
+        """把一批记录归约为生成报表所需的聚合结果，各批结果可用 merge_aggregates 合并"""
+        keys = ["开始时间", "地图"]
+        team = df["队伍"]
+        matches = pd.DataFrame({
+            "开始时间": df["开始时间"], "地图": df["地图"],
+            "red": df["得分"].where(team == "红队", 0),
+            "blue": df["得分"].where(team == "蓝队", 0),
+        }).groupby(keys, sort=False, observed=True).sum()
+        # 每场第一个排名为 1 的记录所在队伍，用于平分时决胜
+        first = df.loc[df["排名"].eq(1).fillna(False), keys + ["队伍"]].drop_duplicates(keys).set_index(keys)["队伍"]
+        matches["tie"] = first.reindex(matches.index).astype(object)
+        matches = matches.reset_index().astype({"开始时间": object, "地图": object})
+
+        players = df.groupby("显示名称").agg(总分=("得分", "sum"), 场次=("地图", "count"), 队伍=("队伍", "first"))
+        players["队伍"] = players["队伍"].astype(object)
+
+        cars = df["车辆"].dropna().value_counts() if "车辆" in df.columns else pd.Series(dtype=int)
+        cars = cars[cars > 0]
+        cars.index = cars.index.astype(object)
+
+        return {
+            "meta": {
+                "first_time": df["开始时间"].iloc[0] if "开始时间" in df.columns and not df.empty else None,
+                "mode": df["模式"].iloc[0] if "模式" in df.columns else "未知模式",
+            },
+            "matches": matches,
+            "ranks": pd.crosstab(df["显示名称"], df["排名"]).reindex(columns=range(1, 9), fill_value=0),
+            "players": players,
+            "cars": cars,
+        }
+
+    @staticmethod
+    def merge_aggregates(parts):
+        """按顺序合并多批聚合结果：比赛按首次出现顺序合并，玩家与车辆计数相加"""
+        parts = list(parts)
+        if not parts:
+            return None
+        if len(parts) == 1:
+            return parts[0]
+
+        matches = pd.concat([p["matches"] for p in parts], ignore_index=True)
+        matches = matches.groupby(["开始时间", "地图"], sort=False).agg(
+            red=("red", "sum"), blue=("blue", "sum"), tie=("tie", "first")).reset_index()
+        players = pd.concat([p["players"] for p in parts]).groupby(level=0).agg(
+            总分=("总分", "sum"), 场次=("场次", "sum"), 队伍=("队伍", "first"))
+        return {
+            "meta": parts[0]["meta"],
+            "matches": matches,
+            "ranks": pd.concat([p["ranks"] for p in parts]).groupby(level=0).sum(),
+            "players": players,
+            "cars": pd.concat([p["cars"] for p in parts]).groupby(level=0).sum(),
+        }
+
+    def summarize_matches(self, df):
+        """逐场汇总红蓝队得分与胜方 (一次向量化计算)，返回列 map/red/blue/win，按比赛首次出现的顺序排列"""
+        return self._match_summary(self.aggregate(df)["matches"])
+
+    @staticmethod
+    def _match_summary(matches):
+        """平分时由排名第 1 的玩家所在队伍获胜，没有第 1 名则判红队胜"""
+        red, blue = matches["red"].astype(int), matches["blue"].astype(int)
+        tie_win = matches["tie"].fillna("红队")
+        win = np.where(red > blue, "红队", np.where(blue > red, "蓝队", tie_win))
+        return pd.DataFrame({
+            "map": matches["地图"].to_numpy(),
+            "red": red.to_numpy(), "blue": blue.to_numpy(), "win": win,
+        })
+
+    def build_report(self, df, custom_pages, output_dir):
+        return self.render_report(self.aggregate(df), custom_pages, output_dir)
+
+    def format_date(self, first_time):
+        """比赛开始时间 → 报表日期 (YYYY-MM-DD)，缺少年份时补 default_year"""
+        if first_time is None:
+            return "未知日期"
+        date_part = str(first_time).strip().split(' ')[0]
+        if len(date_part.split('-')) == 2:
+            return f"{self.default_year}-{date_part}"
+        if "/" in date_part:
+            return date_part.replace("/", "-")
+        return date_part
+
+    def render_report(self, aggs, custom_pages, output_dir, title=None, nights_html=""):
+        """由聚合结果渲染并写出 HTML 报表；title 覆盖标题日期，nights_html 为赛季报表的每晚战况"""
+        output_dir = Path(output_dir)
+        if not output_dir.exists():
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+        meta = aggs["meta"]
+        m_date = title or self.format_date(meta["first_time"])
+        m_mode = meta["mode"]
+        cars = aggs["cars"]
+        # 与 Series.mode() 一致：出现次数最多者中取排序最靠前的
+        m_car = sorted(cars[cars == cars.max()].index)[0] if not cars.empty else "未知车辆"
+
+        summary = self._match_summary(aggs["matches"])
+        r_wins_total = int((summary["win"] == "红队").sum())
+        b_wins_total = int((summary["win"] == "蓝队").sum())
+        r_score_total = int(summary["red"].sum())
+        b_score_total = int(summary["blue"].sum())
 
         global_winner = "红队" if r_wins_total >= b_wins_total else "蓝队"
         red_cls = "winner" if r_wins_total >= b_wins_total else ""
         blue_cls = "winner" if b_wins_total > r_wins_total else ""
 
-        ranks = pd.crosstab(df["显示名称"], df["排名"]).reindex(columns=range(1, 9), fill_value=0)
-        player_teams = df.groupby("显示名称")["队伍"].first()
-        stats = df.groupby("显示名称").agg({"得分": "sum", "地图": "count"}).rename(columns={"地图": "场次", "得分": "总分"})
-        report = pd.concat([ranks, stats, player_teams], axis=1).sort_values("总分", ascending=False)
+        players = aggs["players"]
+        report = pd.concat([aggs["ranks"], players[["总分", "场次"]], players["队伍"]], axis=1).sort_values("总分", ascending=False)
 
         try:
             mvp_row = report[report["队伍"] == global_winner].iloc[0]
@@ -131,11 +507,13 @@ class ReportGenerator:
             mvp_name = fmvp_name = "N/A"
             mvp_score = fmvp_score = mvp_1st = fmvp_1st = 0
 
-        rows_html = ""
-        for n, r in report.iterrows():
-            t_bg = "bg-red" if r["队伍"] == "红队" else "bg-blue"
-            tds = "".join([f"<td>{r[i] if r[i]>0 else '-'}</td>" for i in range(1, 9)])
-            rows_html += f"<tr><td class='player-name' title='{n}'>{n}</td><td><span class='team-badge {t_bg}'>{r['队伍']}</span></td>{tds}<td>{r['场次']}</td><td class='total-score'>{r['总分']}</td></tr>"
+        rows = []
+        rank_cols = [report[i].tolist() for i in range(1, 9)]
+        for n, team, games, total, *rk in zip(report.index, report["队伍"], report["场次"], report["总分"], *rank_cols):
+            t_bg = "bg-red" if team == "红队" else "bg-blue"
+            tds = "".join([f"<td>{v if v > 0 else '-'}</td>" for v in rk])
+            rows.append(f"<tr><td class='player-name' title='{n}'>{n}</td><td><span class='team-badge {t_bg}'>{team}</span></td>{tds}<td>{games}</td><td class='total-score'>{total}</td></tr>")
+        rows_html = "".join(rows)
 
         map_idx = {n: i for i, n in enumerate(OFFICIAL_MAP_ORDER)}
         pages_data = []
@@ -145,58 +523,66 @@ class ReportGenerator:
 
         bar_cats, bar_r, bar_b = [], [], []
 
+        map_pos = summary["map"].map(map_idx)
         for pc in custom_pages:
             p_name = pc.get("name", "未命名")
             s_map, e_map = pc.get("start_map", ""), pc.get("end_map", "")
             s_idx = map_idx.get(s_map, 0) if s_map else 0
             e_idx = map_idx.get(e_map, 9999) if e_map else 9999
-            subset = [m for m in summary if s_idx <= map_idx.get(m["map"], -1) <= e_idx]
-            if subset:
-                subset.sort(key=lambda x: map_idx.get(x["map"], 9999))
+            subset = summary[map_pos.between(s_idx, e_idx)]
+            if not subset.empty:
+                subset = subset.iloc[map_pos[subset.index].argsort(kind="stable")]
                 pages_data.append({"name": p_name, "data": subset})
                 bar_cats.append(p_name)
-                bar_r.append(sum(1 for x in subset if x["win"] == "红队"))
-                bar_b.append(sum(1 for x in subset if x["win"] == "蓝队"))
+                bar_r.append(int((subset["win"] == "红队").sum()))
+                bar_b.append(int((subset["win"] == "蓝队").sum()))
 
-        dyn_html = ""
+        dyn_html = []
         all_charts = []
         for i, p in enumerate(pages_data):
             div_id = f"chart_dynamic_{i}"
-            dyn_html += f'<div class="card chart-row"><div class="chart-header">{p["name"]} 走势图</div><div id="{div_id}" class="echart-box"></div></div>'
+            dyn_html.append(f'<div class="card chart-row"><div class="chart-header">{p["name"]} 走势图</div><div id="{div_id}" class="echart-box"></div></div>')
             all_charts.append({
-                "maps": [x["map"] for x in p["data"]],
-                "red": [x["red"] for x in p["data"]],
-                "blue": [x["blue"] for x in p["data"]]
+                "maps": p["data"]["map"].tolist(),
+                "red": p["data"]["red"].tolist(),
+                "blue": p["data"]["blue"].tolist()
             })
 
-        html_template = self.load_template()
-        html = html_template.replace("{DATE}", m_date)\
-            .replace("{MODE}", m_mode)\
-            .replace("{CAR}", m_car)\
-            .replace("{R_WINS}", str(r_wins_total))\
-            .replace("{B_WINS}", str(b_wins_total))\
-            .replace("{RED_CLS}", red_cls)\
-            .replace("{BLUE_CLS}", blue_cls)\
-            .replace("{R_SCORE}", str(r_score_total))\
-            .replace("{B_SCORE}", str(b_score_total))\
-            .replace("{MVP_N}", str(mvp_name))\
-            .replace("{MVP_S}", str(mvp_score))\
-            .replace("{MVP_1}", str(mvp_1st))\
-            .replace("{FMVP_N}", str(fmvp_name))\
-            .replace("{FMVP_S}", str(fmvp_score))\
-            .replace("{FMVP_1}", str(fmvp_1st))\
-            .replace("{ROWS}", rows_html)\
-            .replace("{BAR_CATS}", json.dumps(bar_cats, ensure_ascii=False))\
-            .replace("{BAR_R}", json.dumps(bar_r))\
-            .replace("{BAR_B}", json.dumps(bar_b))\
-            .replace("{DYNAMIC_CHARTS_HTML}", dyn_html)\
-            .replace("{ALL_CHARTS_DATA}", json.dumps(all_charts, ensure_ascii=False))
+        html = self.load_template().render({
+            "DATE": m_date,
+            "MODE": m_mode,
+            "CAR": m_car,
+            "R_WINS": r_wins_total,
+            "B_WINS": b_wins_total,
+            "RED_CLS": red_cls,
+            "BLUE_CLS": blue_cls,
+            "R_SCORE": r_score_total,
+            "B_SCORE": b_score_total,
+            "MVP_N": mvp_name,
+            "MVP_S": mvp_score,
+            "MVP_1": mvp_1st,
+            "FMVP_N": fmvp_name,
+            "FMVP_S": fmvp_score,
+            "FMVP_1": fmvp_1st,
+            "ROWS": rows_html,
+            "BAR_CATS": json.dumps(bar_cats, ensure_ascii=False),
+            "BAR_R": json.dumps(bar_r),
+            "BAR_B": json.dumps(bar_b),
+            "NIGHTS_HTML": nights_html,
+            "DYNAMIC_CHARTS_HTML": "".join(dyn_html),
+            "ALL_CHARTS_DATA": json.dumps(all_charts, ensure_ascii=False),
+        })
 
         timestamp = int(time.time())
         safe_date_filename = m_date.replace(":", "-").replace(" ", "_")
         out_filename = f"Report_{safe_date_filename}_{timestamp}.html"
         out_path = output_dir / out_filename
-        
+        # 同一秒内生成多份报表时不覆盖 (缓存记录指向的报表必须保持原内容)
+        n = 2
+        while out_path.exists():
+            out_path = output_dir / f"Report_{safe_date_filename}_{timestamp}_{n}.html"
+            n += 1
+
         with open(out_path, "w", encoding="utf-8") as f:
             f.write(html)
 
@@ -208,3 +594,7 @@ class ReportGenerator:
 
         logger.info(f"报表已生成: {out_path.name}")
         return out_path
+
+def _aggregate_paths_job(group, sub_map, chunksize):
+    """进程池任务：在子进程中聚合一组文件"""
+    return ReportGenerator(use_cache=False).aggregate_paths(group, sub_map, chunksize)
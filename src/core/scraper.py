@@ -1,21 +1,49 @@
 import requests
-import ddddocr
+import copy
+import os
 import random
-import csv
 import time
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from src.core.captcha import get_solver
+from src.core.detail_cache import DetailCache
+from src.core.crawl_state import CrawlStateStore
+from src.core.html_extract import parse_page, extract_page
+from src.core.session_store import SessionStore
+from src.core.record_sink import ListSink, CsvSink, DEFAULT_HEADER
+from src.core.metrics import CrawlMetrics
+from src.core.name_normalizer import get_normalizer
+from src.core.rate_control import AdaptiveLimiter, backoff_delay
+from src.utils.constants import OFFICIAL_MAP_ORDER, GAME_MODES, MAP_CODES
+from src.utils.time_utils import parse_start_time
+
+# 服务端限流/过载时返回的状态码
+THROTTLE_STATUS = (429, 503)
+
+# 同一晚的比赛间隔不会超过这个时长，用于判断列表页是否已越过本场次
+SESSION_GAP = timedelta(hours=6)
+MAP_INDEX = {name: i for i, name in enumerate(OFFICIAL_MAP_ORDER)}
+
+class CrawlCancelled(Exception):
+    """抓取已被 stop() 取消"""
 
 class CrazyCarScraper:
-    def __init__(self, username, password, log_callback=None):
-        self.base_url = "https://ckfksc.com"
+    def __init__(self, username, password, log_callback=None, max_workers=20, use_cache=True,
+                 timeout=10, max_retries=3, base_url="https://ckfksc.com"):
+        self.base_url = base_url.rstrip("/")
         self.username = username
         self.password = password
         self.log_callback = log_callback
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
         
         self.session = requests.Session()
         # 增加连接池大小，适应多线程
-        adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
         self.session.mount('https://', adapter)
         self.session.mount('http://', adapter)
         
@@ -24,88 +52,523 @@ class CrazyCarScraper:
             "X-Requested-With": "XMLHttpRequest",
             "Referer": f"{self.base_url}/login",
         })
-        self.ocr = ddddocr.DdddOcr(show_ad=False)
         self.is_running = False
 
+        # 详情页本地缓存，重复分析重叠的地图范围时只请求新比赛
+        self.detail_cache = DetailCache() if use_cache else None
+        self._stats_lock = threading.Lock()
+        self.metrics = CrawlMetrics()
+        self._cancel = threading.Event()
+        self.crawl_state = CrawlStateStore()
+        self.session_store = SessionStore()
+
+        # 自适应并发：线程池按上限开满，实际在途请求数由 limiter 按延迟和错误动态调整
+        self.limiter = AdaptiveLimiter(initial=min(4, max_workers), max_limit=max_workers)
+        self.dropped = []
+
+    @property
+    def ocr(self):
+        """进程内共享的验证码识别器，模型只加载一次 (见 src/core/captcha.py)"""
+        return get_solver()
+
+    def fork(self, log_prefix=""):
+        """复制出一个共享会话、并发控制器和各类缓存的抓取器，用于同一登录下并行抓取多个模式"""
+        worker = copy.copy(self)
+        worker.is_running = False
+        worker.dropped = []
+        worker._stats_lock = threading.Lock()
+        worker.metrics = CrawlMetrics()
+        worker._cancel = threading.Event()
+        if self._cancel.is_set():
+            worker._cancel.set()
+        if log_prefix:
+            worker.log_callback = lambda message: self.log(f"{log_prefix}{message.lstrip()}")
+        return worker
+
     def log(self, message):
         if self.log_callback:
             self.log_callback(message)
         else:
             print(message)
 
-    def login(self):
-        self.log(f"🚀 正在登录账号: {self.username} ...")
+    def _restore_session(self):
+        """载入保存的 Cookie，并用一次列表页请求确认登录状态仍然有效"""
+        cookies = self.session_store.load(self.username)
+        if not cookies:
+            return False
+        for c in cookies:
+            self.session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"),
+                                     expires=c.get("expires"))
         try:
-            self.session.get(f"{self.base_url}/login")
-            captcha_resp = self.session.get(
-                f"{self.base_url}/captcha?r={random.random()}")
-            
+            # 会话失效时站点会跳转到登录页，不跟随跳转即可判断
+            resp = self.session.get(self._list_url(0, 1), timeout=self.timeout, allow_redirects=False)
+            if resp.status_code == 200 and extract_page(resp.text) is not None:
+                return True
+        except requests.RequestException:
+            pass
+        self.session.cookies.clear()
+        self.session_store.clear(self.username)
+        return False
+
+    def _login_once(self):
+        """完整登录一次 (含验证码识别)，返回 (是否成功, 提示信息)"""
+        self.session.get(f"{self.base_url}/login", timeout=self.timeout)
+        captcha_resp = self.session.get(
+            f"{self.base_url}/captcha?r={random.random()}", timeout=self.timeout)
+        
+        with self.metrics.timer("captcha_ocr"):
             captcha_code = self.ocr.classification(
                 captcha_resp.content).strip().upper()
-            
-            payload = {
-                "areaCode": "86", 
-                "mobileNo": self.username,
-                "password": self.password, 
-                "captcha": captcha_code
-            }
-            
-            res = self.session.post(
-                f"{self.base_url}/login", data=payload).json()
-            
-            if res.get("respCo") == "0000":
-                self.log(f"✅ 登录成功! 验证码: [{captcha_code}]")
-                return True
-            
-            self.log(f"❌ 登录失败: {res.get('respMsg')}")
-            return False
+        
+        payload = {
+            "areaCode": "86", 
+            "mobileNo": self.username,
+            "password": self.password, 
+            "captcha": captcha_code
+        }
+        
+        res = self.session.post(
+            f"{self.base_url}/login", data=payload, timeout=self.timeout).json()
+        
+        if res.get("respCo") == "0000":
+            return True, f"验证码: [{captcha_code}]"
+        return False, res.get("respMsg") or ""
+
+    def login(self, use_saved=True, max_attempts=3):
+        with self.metrics.timer("login"):
+            return self._login(use_saved, max_attempts)
+
+    def _login(self, use_saved, max_attempts):
+        self.log(f"🚀 正在登录账号: {self.username} ...")
+        if use_saved and self._restore_session():
+            self.log("✅ 登录成功! (复用已保存的登录状态)")
+            return True
+
+        try:
+            for attempt in range(1, max_attempts + 1):
+                ok, msg = self._login_once()
+                if ok:
+                    self.log(f"✅ 登录成功! {msg}")
+                    self.session_store.save(self.username, self.session.cookies)
+                    return True
+
+                # 验证码识别错误时重新获取验证码重试，其他错误 (如密码错误) 直接失败
+                if "验证码" in msg and attempt < max_attempts:
+                    self.log(f"🔁 验证码错误，重新识别 ({attempt}/{max_attempts})...")
+                    continue
+                self.log(f"❌ 登录失败: {msg}")
+                return False
         except Exception as e:
             self.log(f"❌ 登录异常: {e}")
-            return False
+        return False
 
-    def clean_data(self, records, substitution_map):
+    def clean_rows(self, records, substitution_map, header=None):
+        """逐行规范角色名称的生成器，供流式写出使用；只处理 角色 列，其余列原样保留"""
         if not substitution_map:
-            return records
-        cleaned = []
+            yield from records
+            return
+        header = header or DEFAULT_HEADER
+        if "角色" not in header:
+            yield from records
+            return
+        idx = header.index("角色")
+        normalize = get_normalizer(substitution_map)
         for r in records:
-            new_row = []
-            for item in r:
-                s_item = str(item).replace('\xa0', ' ').strip()
-                new_row.append(substitution_map.get(s_item, s_item))
-            cleaned.append(new_row)
-        return cleaned
+            if len(r) > idx:
+                r = list(r)
+                r[idx] = normalize(r[idx])
+            yield r
+
+    def clean_data(self, records, substitution_map, header=None):
+        if not substitution_map:
+            return records
+        return list(self.clean_rows(records, substitution_map, header))
+
+    def _parse(self, html, list_page=True):
+        with self.metrics.timer("parse"):
+            return parse_page(html, list_page)
+
+    def _get(self, url, stage="list_fetch"):
+        """受并发控制的 GET 请求，失败/限流时带抖动指数退避重试，重试耗尽后抛出最后一次异常"""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.metrics.incr("retries")
+                # 退避等待期间可被 stop() 立即打断
+                if self._cancel.wait(backoff_delay(attempt - 1)):
+                    raise CrawlCancelled()
+
+            if not self.limiter.acquire(self._cancel):
+                raise CrawlCancelled()
+            t0 = time.monotonic()
+            try:
+                resp = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                self.limiter.release(ok=False)
+                self.metrics.add_time(stage, time.monotonic() - t0)
+                self.metrics.incr("errors")
+                last_error = e
+                continue
+
+            latency = time.monotonic() - t0
+            self.metrics.add_time(stage, latency)
+            self.metrics.incr("requests")
+            self.metrics.incr("bytes_received", len(resp.content))
+            if resp.status_code in THROTTLE_STATUS:
+                self.metrics.incr("throttled")
+                retry_after = resp.headers.get("Retry-After", "")
+                self.limiter.release(throttled=True,
+                                     retry_after=float(retry_after) if retry_after.isdigit() else None)
+                last_error = requests.HTTPError(f"HTTP {resp.status_code} (限流)", response=resp)
+                continue
+            if resp.status_code >= 500:
+                self.metrics.incr("errors")
+                self.limiter.release(ok=False)
+                last_error = requests.HTTPError(f"HTTP {resp.status_code}", response=resp)
+                continue
+
+            self.limiter.release(latency=latency)
+            return resp
+        raise last_error
 
     def fetch_detail(self, summary_data, detail_url):
         """单独抓取一个详情页的线程函数"""
+        if self.detail_cache:
+            cached = self.detail_cache.get(detail_url)
+            if cached:
+                self.metrics.incr("cache_hits")
+                th, cells = cached
+                header = ["模式", "地图", "开始时间"] + th if th else None
+                return header, [summary_data + c for c in cells]
+
         try:
-            resp = self.session.get(detail_url, timeout=10)
-            d_soup = BeautifulSoup(resp.text, "html.parser")
-            
-            # 提取表头 (如果是第一次)
-            header = None
-            h_row = d_soup.select_one("table.table thead tr")
-            if h_row:
-                header = ["模式", "地图", "开始时间"] + [th.text.strip() for th in h_row.find_all("th")]
-
-            # 提取数据行
-            rows = []
-            for dr in d_soup.select("table.table tbody tr"):
-                row_data = summary_data + [td.text.strip() for td in dr.find_all("td")]
-                rows.append(row_data)
-                
-            return header, rows
+            resp = self._get(detail_url, stage="detail_fetch")
+            # 只提取表头和数据行，不构建整棵 DOM
+            parsed = self._parse(resp.text, list_page=False)
+            th, cells = parsed.header, parsed.rows
+        except CrawlCancelled:
+            return None, []
         except Exception as e:
-            # self.log(f"⚠️ 详情抓取失败: {e}") # 线程中尽量少log，避免UI卡顿
+            # 重试耗尽仍失败，记录下来而不是悄悄丢掉这场比赛
+            with self._stats_lock:
+                self.dropped.append((summary_data, detail_url))
+            self.metrics.incr("dropped_matches")
+            self.log(f"⚠️ 详情抓取失败 [{summary_data[1]} {summary_data[2]}]: {e}")
             return None, []
 
-    def start_crawl(self, game_type, start_maps, end_map, substitution_map=None):
-        self.is_running = True
-        
-        game_modes = ["个人竞速", "组队竞速", "个人道具", "组队道具", "个人疾爽", "组队疾爽"]
-        if game_type in game_modes:
-            game_type_id = str(game_modes.index(game_type))
-        else:
-            game_type_id = game_type
+        # 只缓存有数据的详情页，空页可能是比赛尚未结束
+        if self.detail_cache and cells:
+            self.detail_cache.put(detail_url, th, cells)
+
+        header = ["模式", "地图", "开始时间"] + th if th else None
+        return header, [summary_data + c for c in cells]
+
+    def _list_url(self, game_type_id, page, map_name=""):
+        map_code = quote(MAP_CODES.get(map_name, map_name)) if map_name else ""
+        return f"{self.base_url}/user/game?pageNum={page}&gameType={game_type_id}&mapCode={map_code}"
+
+    def _seek_end_page(self, game_type_id, end_map, probed):
+        """倍增 + 二分探测结束地图所在的列表页，返回顺序抓取的起始页码
+
+        依据：列表按开始时间倒序，而同一晚的比赛按官方地图顺序进行。某页一旦出现
+        结束地图、顺序在它之前的地图，或与最新比赛相隔超过 SESSION_GAP 的比赛，
+        说明已到达 (或越过) 结束地图。探测过的页面存入 probed，供后续抓取复用。
+        """
+        end_idx = MAP_INDEX.get(end_map)
+        if end_idx is None:
+            return 1
+
+        newest = None
+
+        def reached(page):
+            nonlocal newest
+            if page not in probed:
+                try:
+                    probed[page] = self._parse(self._get(self._list_url(game_type_id, page)).text)
+                except Exception:
+                    return True
+            rows = [c for c in probed[page].rows if c and "没有对局" not in c[0] and len(c) > 6]
+            if not rows:
+                return True
+            for cols in rows:
+                t = parse_start_time(cols[6])
+                if newest is None:
+                    newest = t
+                idx = MAP_INDEX.get(cols[1])
+                if cols[1] == end_map or (idx is not None and idx < end_idx):
+                    return True
+                if newest and t and newest - t > SESSION_GAP:
+                    return True
+            return False
+
+        if reached(1):
+            return 1
+
+        lo, hi = 1, 2
+        while self.is_running and not reached(hi):
+            lo, hi = hi, hi * 2
+        while self.is_running and hi - lo > 1:
+            mid = (lo + hi) // 2
+            if reached(mid):
+                hi = mid
+            else:
+                lo = mid
+
+        # 定位页必须真的包含结束地图，否则 (例如本晚没打这张图) 回退到逐页扫描
+        page = probed.get(hi)
+        if page and any(len(c) > 1 and c[1] == end_map for c in page.rows):
+            self.log(f"🦘 跳页定位: 结束地图 [{end_map}] 位于第 {hi} 页 (探测 {len(probed)} 页)")
+            return hi
+        self.log("⚠️ 跳页定位未命中结束地图，改为从第 1 页逐页查找")
+        return 1
+
+    def _produce_tasks(self, game_type_id, start_maps, end_map, task_queue, known=None, progress=None,
+                       fast_seek=False):
+        """列表页生产者：持续翻页，把详情任务放入有界队列，详情抓取慢时自动阻塞
+
+        known 为上次抓取保存的比赛索引；翻页遇到其中的比赛即说明已到达水位，
+        之后的比赛直接从索引回放 (详情走本地缓存)，不再请求列表页。
+        """
+        collecting = True if not end_map else False
+        known = known or []
+        known_pos = {u: i for i, (_, u) in enumerate(known)}
+        queued_urls = set()
+        seen_urls = set()
+        if progress is None:
+            progress = {}
+        progress.update({"seen": [], "linked": False, "link_pos": 0})
+
+        def handle(summary, d_url):
+            """处理一场比赛，返回 True 表示已到达起始地图"""
+            nonlocal collecting
+            if d_url and d_url not in seen_urls:
+                seen_urls.add(d_url)
+                progress["seen"].append((summary, d_url))
+
+            current_map = summary[1]
+
+            # 1. Start Condition
+            if not collecting:
+                if current_map == end_map:
+                    collecting = True
+                    self.log(f"✅ 找到结束地图 [{end_map}]，开始录制...")
+                else:
+                    return False
+
+            # 2. Add to tasks
+            if d_url and d_url not in queued_urls:
+                queued_urls.add(d_url)
+                self._put(task_queue, (summary, d_url, page))
+
+            # 3. Stop Condition: 起始地图这一条要抓，更旧的不要了
+            if current_map in start_maps:
+                self.log(f"🏁 找到起始地图 [{current_map}]，本页处理完后停止！")
+                return True
+            return False
+
+        def replay(pos):
+            """从本地索引回放水位之后的比赛，返回是否已到达起始地图"""
+            self.log(f"🔖 已到达上次抓取的水位，其余 {len(known) - pos} 场比赛从本地索引读取")
+            progress["linked"] = True
+            progress["link_pos"] = pos
+            for summary, d_url in known[pos:]:
+                if not self.is_running:
+                    return True
+                if handle(summary, d_url):
+                    return True
+            self.log("⚠️ 本地索引已用完，仍未到达起始地图，继续联网翻页...")
+            return False
+
+        try:
+            probed = {}
+            page = self._seek_end_page(game_type_id, end_map, probed) if end_map and fast_seek else 1
+
+            while self.is_running:
+                self.log(f"📄 请求第 {page} 页数据...")
+
+                try:
+                    parsed = probed.pop(page, None) or self._parse(self._get(self._list_url(game_type_id, page)).text)
+                except CrawlCancelled:
+                    break
+                except Exception as e:
+                    self.log(f"❌ 请求异常: {e}")
+                    break
+
+                if not parsed.rows:
+                    self.log("📭 已无更多数据")
+                    break
+
+                stop_signal = False
+                queued_before = len(queued_urls)
+                for cols, href in zip(parsed.rows, parsed.links):
+                    if not self.is_running: break
+
+                    if not cols or "没有对局" in cols[0] or len(cols) < 7:
+                        continue
+
+                    summary = [cols[0], cols[1], cols[6]]
+                    d_url = self.base_url + href if href else None
+
+                    if d_url in known_pos and not progress["linked"]:
+                        stop_signal = replay(known_pos[d_url])
+                        if stop_signal:
+                            break
+                        continue
+
+                    if handle(summary, d_url):
+                        stop_signal = True
+                        break
+
+                queued = len(queued_urls) - queued_before
+                if queued:
+                    self.log(f"   ⚡ 第 {page} 页已排队 {queued} 场比赛详情...")
+
+                if stop_signal:
+                    break
+
+                if parsed.has_next:
+                    page += 1
+                else:
+                    self.log("⚠️ 已翻至最后一页，未找到指定的起始地图，但已停止。")
+                    break
+        finally:
+            self._put(task_queue, None)
+
+    def _resolve_game_type(self, game_type):
+        if game_type in GAME_MODES:
+            return str(GAME_MODES.index(game_type))
+        return game_type
+
+    def _run_pipeline(self, produce, sink, substitution_map=None):
+        """流水线执行：produce(task_queue) 在独立线程中产出详情任务 (summary, url, 页码)，以 None 结束；
+        详情页由同一个长期线程池处理，结果按任务顺序经名称替换后写入 sink，每写完一页刷新一次"""
+        window = self.max_workers * 2
+        task_queue = queue.Queue(maxsize=window)
+        # 槽位在结果写出后才归还：在途 + 等待写出的详情不超过 window 个，内存与抓取长度无关
+        slots = threading.BoundedSemaphore(window)
+        sink_lock = threading.Lock()
+        done = {}
+        state = {"next": 0, "page": None}
+        errors = []
+
+        def on_done(future, seq, page):
+            if future.cancelled():
+                # stop() 时被丢弃的排队任务
+                slots.release()
+                return
+            try:
+                h, rows = future.result()
+            except Exception as e:
+                errors.append(e)
+                h, rows = None, []
+            with sink_lock:
+                if state.get("closed"):
+                    slots.release()
+                    return
+                done[seq] = (page, h, rows)
+                # 按提交顺序写出已完成的连续前缀，保持列表页的先后顺序
+                while state["next"] in done:
+                    page_i, h, rows = done.pop(state["next"])
+                    state["next"] += 1
+                    try:
+                        if state["page"] is not None and page_i != state["page"]:
+                            sink.flush()
+                        state["page"] = page_i
+                        if rows:
+                            with self.metrics.timer("substitution"):
+                                cleaned = list(self.clean_rows(rows, substitution_map, h))
+                            with self.metrics.timer("write"):
+                                # 本地比赛库保存原始角色名，CSV 等保存替换后的显示名称
+                                sink.write(h, cleaned, raw_rows=rows)
+                            self.metrics.incr("matches")
+                            self.metrics.incr("records", len(rows))
+                    except Exception as e:
+                        errors.append(e)
+                    finally:
+                        slots.release()
+
+        producer = threading.Thread(target=produce, args=(task_queue,), daemon=True)
+        producer.start()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        seq = 0
+        try:
+            while not self._cancel.is_set():
+                try:
+                    task = task_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if task is None:
+                    break
+                summary, d_url, page = task
+                # 限制未写出的详情任务数量，让背压传回列表页生产者
+                while not slots.acquire(timeout=0.1):
+                    if self._cancel.is_set():
+                        break
+                else:
+                    future = executor.submit(self.fetch_detail, summary, d_url)
+                    future.add_done_callback(lambda f, s=seq, p=page: on_done(f, s, p))
+                    seq += 1
+        finally:
+            cancelled = self._cancel.is_set()
+            # 取消时丢弃尚未开始的任务，也不等待在途请求，已完成的结果立即写出。
+            # 在途请求无法中途打断，会在后台线程中按原超时 (self.timeout) 结束，其结果直接丢弃
+            executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+
+        with sink_lock:
+            if cancelled:
+                for k in sorted(done):
+                    page_i, h, rows = done.pop(k)
+                    if rows:
+                        sink.write(h, list(self.clean_rows(rows, substitution_map, h)), raw_rows=rows)
+                        self.metrics.incr("matches")
+                        self.metrics.incr("records", len(rows))
+            # 之后才完成的在途请求不再写入 sink
+            state["closed"] = True
+            sink.flush()
+
+        if not cancelled:
+            producer.join()
+        if errors:
+            self.log(f"❌ 写入数据失败: {errors[0]}")
+
+    def _put(self, task_queue, item):
+        """向有界队列放入任务，取消后放弃 (消费者已不再读取)"""
+        while not self._cancel.is_set():
+            try:
+                task_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _begin_crawl(self):
+        # 不在这里清除取消标志：登录或识别验证码期间请求的停止对随后的抓取同样有效
+        self.is_running = not self._cancel.is_set()
+        self.dropped = []
+        self.metrics.reset(keep_stages=("login", "captcha_ocr"))
+
+    def _finish_crawl(self, sink):
+        self.is_running = False
+        self.log(f"📊 共抓取 {sink.count} 条记录")
+        if self.metrics.get("cache_hits"):
+            self.log(f"   💾 {self.metrics.get('cache_hits')} 场比赛详情来自本地缓存")
+        if self.metrics.get("retries"):
+            self.log(f"   🔁 共重试 {self.metrics.get('retries')} 次请求，当前并发上限 {int(self.limiter.limit)}")
+        if self.dropped:
+            self.log(f"⚠️ 有 {len(self.dropped)} 场比赛详情多次重试后仍抓取失败，数据不完整")
+
+        combined_header = sink.header
+        if not combined_header and sink.count:
+            combined_header = DEFAULT_HEADER
+
+        return combined_header, sink.records
+
+    def start_crawl(self, game_type, start_maps, end_map, substitution_map=None, incremental=False,
+                    fast_seek=True, sink=None):
+        """按地图范围抓取；传入 sink (如 CsvSink) 时记录边抓边写出，返回的记录列表为空"""
+        self._begin_crawl()
+        game_type_id = self._resolve_game_type(game_type)
 
         if isinstance(start_maps, str):
             start_maps = [start_maps]
@@ -113,139 +576,158 @@ class CrazyCarScraper:
         self.log(f"\n🕷️ [抓取开始] 模式: {game_type}")
         self.log(f"   🚩 触发开始(最新): {'直接开始' if not end_map else end_map}")
         self.log(f"   🛑 触发停止(最旧): {start_maps}")
-        self.log("   ⚡ 已启用多线程加速 (Max: 10 threads)")
+        self.log(f"   ⚡ 已启用流水线抓取 (自适应并发, 上限: {self.max_workers})")
+
+        known = self.crawl_state.load(self.username, game_type_id) if incremental else []
+        if known:
+            self.log(f"   🔖 增量模式: 本地已有 {len(known)} 场比赛索引")
+        progress = {}
 
+        sink = sink or ListSink()
+        self._run_pipeline(
+            lambda task_queue: self._produce_tasks(
+                game_type_id, start_maps, end_map, task_queue, known, progress, fast_seek),
+            sink, substitution_map)
+
+        if incremental and self.is_running:
+            # 只有与旧索引首尾相接时才能合并，否则中间可能缺少比赛
+            matches = list(progress["seen"])
+            if progress["linked"]:
+                # 按衔接位置拼接：快速定位跳过的前几页中的比赛在索引里排在衔接点之前，保持从新到旧的顺序
+                seen_urls = {u for _, u in matches}
+                pos = progress["link_pos"]
+                matches = ([k for k in known[:pos] if k[1] not in seen_urls] + matches
+                           + [k for k in known[pos:] if k[1] not in seen_urls])
+            self.crawl_state.save(self.username, game_type_id, matches)
+
+        return self._finish_crawl(sink)
+
+    @staticmethod
+    def maps_in_stage(stage):
+        """返回自定义阶段 (custom_pages 中的一项) 覆盖的官方地图列表"""
+        s_map, e_map = stage.get("start_map", ""), stage.get("end_map", "")
+        s_idx = MAP_INDEX.get(s_map, 0) if s_map else 0
+        e_idx = MAP_INDEX.get(e_map, len(OFFICIAL_MAP_ORDER) - 1) if e_map else len(OFFICIAL_MAP_ORDER) - 1
+        return OFFICIAL_MAP_ORDER[s_idx:e_idx + 1]
+
+    def _collect_map_matches(self, game_type_id, map_name, since, first_page=None):
+        """按 mapCode 过滤翻页，收集 since 之后的比赛 [(start_dt, summary, detail_url), ...]
+
+        不依赖服务端一定按 mapCode 过滤 (地图代码未确认时传的是地图名称)：其他地图的比赛在这里跳过。
+        """
+        matches = []
         page = 1
-        collecting = True if not end_map else False
-        collected_records = []
-        combined_header = None
-        stop_signal = False
-
-        while self.is_running and not stop_signal:
-            self.log(f"📄 请求第 {page} 页数据...")
-            url = f"{self.base_url}/user/game?pageNum={page}&gameType={game_type_id}&mapCode="
-            
-            try:
-                resp = self.session.get(url, timeout=10)
-                soup = BeautifulSoup(resp.text, "html.parser")
-            except Exception as e:
-                self.log(f"❌ 请求异常: {e}")
-                break
+        parsed = first_page
+        while self.is_running:
+            if parsed is None:
+                try:
+                    parsed = self._parse(self._get(self._list_url(game_type_id, page, map_name)).text)
+                except CrawlCancelled:
+                    break
+                except Exception as e:
+                    self.log(f"❌ [{map_name}] 第 {page} 页请求异常: {e}")
+                    break
 
-            rows = soup.select("table.table tbody tr")
-            if not rows:
-                self.log("📭 已无更多数据")
+            reached_since = False
+            for cols, href in zip(parsed.rows, parsed.links):
+                if not cols or "没有对局" in cols[0] or len(cols) < 7:
+                    continue
+                t = parse_start_time(cols[6])
+                if since and t and t < since:
+                    reached_since = True
+                    break
+                if href and cols[1] == map_name:
+                    matches.append((t, [cols[0], cols[1], cols[6]], self.base_url + href))
+
+            if reached_since or not parsed.has_next:
                 break
+            page += 1
+            parsed = None
+        return matches
 
-            # 收集本页需要抓取的任务
-            tasks = [] # (summary, url)
+    def start_crawl_maps(self, game_type, maps, substitution_map=None, since=None, sink=None):
+        """只抓取指定地图：每张地图单独发起 mapCode 过滤的列表查询 (并行)，按开始时间合并
 
-            for row in rows:
-                if not self.is_running: break
-                
-                cols = [td.text.strip() for td in row.find_all("td")]
-                if not cols or "没有对局" in cols[0]:
-                    continue
+        since 为最早开始时间 (datetime)；不指定时取所有地图中最新一场比赛往前 SESSION_GAP 的范围，即最近一晚。
+        """
+        self._begin_crawl()
+        game_type_id = self._resolve_game_type(game_type)
+        maps = list(dict.fromkeys(maps))
 
-                current_map = cols[1] if len(cols) > 1 else ""
+        self.log(f"\n🕷️ [按地图抓取] 模式: {game_type}")
+        self.log(f"   🗺️ 目标地图: {maps}")
 
-                # 1. Start Condition
-                if not collecting:
-                    if current_map == end_map:
-                        collecting = True
-                        self.log(f"✅ 找到结束地图 [{end_map}]，开始录制...")
-                    else:
-                        continue
+        def first_page(map_name):
+            try:
+                return self._parse(self._get(self._list_url(game_type_id, 1, map_name)).text)
+            except CrawlCancelled:
+                return None
+            except Exception as e:
+                self.log(f"❌ [{map_name}] 请求异常: {e}")
+                return None
 
-                # 2. Add to tasks
-                if collecting:
-                    summary = [cols[0], cols[1], cols[6]]
-                    dt_tag = row.find("a", string="详情")
-                    if dt_tag and dt_tag.has_attr("href"):
-                        d_url = self.base_url + dt_tag["href"]
-                        tasks.append((summary, d_url))
-
-                    # 3. Stop Condition
-                    if current_map in start_maps:
-                        self.log(f"🏁 找到起始地图 [{current_map}]，本页处理完后停止！")
-                        stop_signal = True
-                        # 注意：这里不能break，因为本条数据也需要抓取
-                        # 但需要标记不再处理后续的row
-                        # 简单处理：把stop_signal设为True，循环会继续把本页剩下的(如果还在rows里)过一遍? 
-                        # 不，应该截断 tasks 列表吗？
-                        # 根据逻辑：遇到起始地图，这一条要抓，但更旧的不要了。
-                        # 所以我们此时break出 row 循环，但在break前已经把当前任务加进去了。
-                        break
-            
-            # 并发执行本页的任务
-            if tasks:
-                self.log(f"   ⚡ 正在并发抓取本页 {len(tasks)} 场比赛详情...")
-                with ThreadPoolExecutor(max_workers=20) as executor:
-                    futures = [executor.submit(self.fetch_detail, t[0], t[1]) for t in tasks]
-                    for future in as_completed(futures):
-                        h, r = future.result()
-                        if h and not combined_header:
-                            combined_header = h
-                        if r:
-                            collected_records.extend(r)
-
-            if stop_signal:
-                break
+        with ThreadPoolExecutor(max_workers=min(len(maps), self.max_workers) or 1) as executor:
+            firsts = dict(zip(maps, executor.map(first_page, maps)))
 
-            if soup.select_one("ul.pagination li.active + li a"):
-                page += 1
-                # 多线程模式下请求非常快，这里稍微多睡一点点防止封IP，或者保持0.5也可
-                time.sleep(0.5)
-            else:
-                self.log("⚠️ 已翻至最后一页，未找到指定的起始地图，但已停止。")
-                break
+            if since is None:
+                times = [parse_start_time(cols[6]) for p in firsts.values() if p
+                         for cols in p.rows if len(cols) > 6 and "没有对局" not in cols[0]]
+                times = [t for t in times if t]
+                since = max(times) - SESSION_GAP if times else None
+                if since:
+                    self.log(f"   🕒 未指定时间范围，抓取 {since:%m-%d %H:%M} 之后的比赛")
 
-        self.is_running = False
-        self.log(f"📊 共抓取 {len(collected_records)} 条记录")
-        
-        final_data = self.clean_data(collected_records, substitution_map)
+            futures = [executor.submit(self._collect_map_matches, game_type_id, m, since, firsts[m])
+                       for m in maps if firsts[m]]
+            # 同一场比赛可能出现在多张地图的查询结果中 (服务端未按地图过滤时)，按详情链接去重
+            matches = list({x[2]: x for f in futures for x in f.result()}.values())
 
-        if not combined_header and final_data:
-            combined_header = ["模式", "地图", "开始时间", "角色", "车辆", "队伍", "排名", "成绩", "经验", "金币"]
+        # 多张地图的结果按开始时间从新到旧合并，与普通列表顺序一致
+        matches.sort(key=lambda x: x[0] or datetime.min, reverse=True)
+        self.log(f"   ⚡ 共找到 {len(matches)} 场比赛，开始抓取详情...")
 
-        return combined_header, final_data
+        def produce(task_queue):
+            try:
+                for i, (_, summary, d_url) in enumerate(matches):
+                    if not self.is_running:
+                        break
+                    self._put(task_queue, (summary, d_url, i // 20))
+            finally:
+                self._put(task_queue, None)
+
+        sink = sink or ListSink()
+        self._run_pipeline(produce, sink, substitution_map)
+        return self._finish_crawl(sink)
+
+    def write_metrics(self, output_path, snapshot=None):
+        """在输出文件旁写出本次抓取的统计摘要 ({文件名}.metrics.json)；snapshot 见 CrawlMetrics.write_json"""
+        path = f"{os.path.splitext(str(output_path))[0]}.metrics.json"
+        try:
+            return self.metrics.write_json(path, snapshot)
+        except OSError as e:
+            self.log(f"⚠️ 写入抓取统计失败: {e}")
+            return None
 
     def stop(self):
+        """立即取消抓取：不再提交新任务、丢弃排队中的详情、不等待在途请求，已抓到的部分照常返回
+
+        停止是一次性的：之后用同一抓取器发起的抓取会立即结束 (命令行与工作进程每个任务都新建抓取器)。
+        """
         self.is_running = False
+        self._cancel.set()
         self.log("🛑 正在停止抓取...")
 
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
     def save_to_csv(self, header, records, output_dir):
-        # ... (保持不变)
         if not records:
             return None
-            
-        first = records[0]
-        mode = first[0] if first else "未知"
-        date_str = first[2].split()[0] if len(first) > 2 else "00-00"
-        filename = f"{date_str}_{mode}.csv"
-        
-        import os
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            
-        out_path = os.path.join(output_dir, filename)
-
+        sink = CsvSink(output_dir, self.log)
         try:
-            with open(out_path, "w", encoding="utf-8-sig", newline="") as f:
-                writer = csv.writer(f)
-                if header:
-                    writer.writerow(header)
-                
-                s_idx = header.index("成绩") if header and "成绩" in header else -1
-                
-                for row in records:
-                    r = [str(x) for x in row]
-                    if s_idx != -1 and s_idx < len(r) and ":" in r[s_idx]:
-                        r[s_idx] = f"'{r[s_idx]}"
-                    writer.writerow(r)
-            
-            self.log(f"✅ CSV保存成功: {filename}")
-            return out_path
+            sink.write(header, records)
+            return sink.close()
         except Exception as e:
             self.log(f"❌ 保存CSV失败: {e}")
             return None
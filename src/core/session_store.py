@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from src.utils.paths import get_config_dir
+from src.utils.encryption import encrypt_password, decrypt_password
+
+class SessionStore:
+    """按账号持久化登录 Cookie，下次运行先校验再复用，避免每次都识别验证码"""
+
+    def __init__(self, session_dir=None):
+        self.session_dir = Path(session_dir) if session_dir else get_config_dir() / "sessions"
+
+    def _path(self, username):
+        digest = hashlib.sha1(str(username).encode("utf-8")).hexdigest()[:16]
+        return self.session_dir / f"{digest}.json"
+
+    def load(self, username):
+        """返回保存的 Cookie 列表，没有或已损坏时返回 None"""
+        path = self._path(username)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("username") != username:
+                return None
+            return json.loads(decrypt_password(data.get("cookies", ""))) or None
+        except (OSError, ValueError):
+            return None
+
+    def save(self, username, cookie_jar):
+        cookies = [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires}
+            for c in cookie_jar
+        ]
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(username)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"username": username,
+                       "cookies": encrypt_password(json.dumps(cookies, ensure_ascii=False))}, f)
+        os.replace(tmp_path, path)
+
+    def clear(self, username):
+        try:
+            self._path(username).unlink()
+        except OSError:
+            pass
@@ -0,0 +1,45 @@
+import hashlib
+import re
+import threading
+from pathlib import Path
+
+# 报表模板中的占位符形如 {ROWS}、{MVP_N}；CSS/JS 里的花括号不会匹配
+PLACEHOLDER = re.compile(r"\{([A-Z][A-Z0-9_]*)\}")
+
+class CompiledTemplate:
+    """预编译的模板：占位符只解析一次，渲染时一次拼接完成"""
+
+    def __init__(self, text):
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        # 偶数位为原文片段，奇数位为占位符名
+        self._parts = PLACEHOLDER.split(text)
+        self.fields = set(self._parts[1::2])
+
+    def render(self, values):
+        """用 values 填充占位符；未提供的占位符原样保留"""
+        out = list(self._parts)
+        for i in range(1, len(out), 2):
+            key = out[i]
+            out[i] = str(values[key]) if key in values else "{" + key + "}"
+        return "".join(out)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def load_template(path):
+    """读取并编译模板，按 (路径, 修改时间, 大小) 缓存在进程内，模板文件被修改后自动重新加载"""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Template not found at {path}")
+    st = path.stat()
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        tpl = _cache.get(key)
+    if tpl is None:
+        tpl = CompiledTemplate(path.read_text(encoding="utf-8"))
+        with _cache_lock:
+            # 同一路径只保留最新版本
+            for k in [k for k in _cache if k[0] == key[0]]:
+                del _cache[k]
+            _cache[key] = tpl
+    return tpl
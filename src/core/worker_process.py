@@ -0,0 +1,197 @@
+"""在独立进程中执行抓取与报表生成，界面进程只负责显示
+
+界面与工作进程通过两个队列通信：
+- 任务队列：界面提交的任务 (dict)，None 表示退出
+- 消息队列：工作进程发回的 ("log", 文本)、("status", 文本, 进度)、("result", 报表路径或 None)、("done",)
+取消通过共享的 Event 传递；工作进程崩溃或取消后迟迟不退出时，界面进程可以直接结束它并重新启动。
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+
+# 请求取消后等待工作进程自行结束的时间，超时则强制结束
+STOP_GRACE = 5.0
+
+def run_job(job, emit, cancel):
+    """执行一次 登录 → 抓取 → 生成报表 (原主页 worker 的流程)，job 为 dict，进度与结果通过 emit 发回"""
+    from src.core.scraper import CrazyCarScraper
+    from src.core.record_sink import CsvSink, StoreSink, TeeSink
+    from src.core.match_store import MatchStore
+    from src.core.report_gen import ReportGenerator
+
+    log = lambda msg: emit("log", msg)
+    log("🚀 初始化爬虫...")
+    # base_url 仅用于指向模拟站点 (基准测试)，默认访问正式站点
+    kwargs = {"base_url": job["base_url"]} if job.get("base_url") else {}
+    scraper = CrazyCarScraper(job["phone"], job["password"], log, **kwargs)
+
+    # 取消请求到达时停止抓取
+    finished = threading.Event()
+
+    def watch_cancel():
+        while not finished.is_set():
+            if cancel.wait(0.2):
+                scraper.stop()
+                return
+
+    threading.Thread(target=watch_cancel, daemon=True).start()
+    try:
+        if not scraper.login():
+            log("❌ 登录失败，终止任务")
+            return
+        if cancel.is_set():
+            log("🛑 任务已取消")
+            return
+
+        emit("status", "🔍 正在抓取比赛数据...", 0.3)
+        output_dir = job["output_dir"]
+        sub_map = job.get("sub_map") or {}
+        # Scrape: 记录边抓取边写入本地比赛库，并导出一份 CSV
+        store = MatchStore()
+        sink = TeeSink(CsvSink(output_dir, log), StoreSink(store))
+        try:
+            if job.get("stage"):
+                scraper.start_crawl_maps(job["mode"], scraper.maps_in_stage(job["stage"]), sub_map, sink=sink)
+            else:
+                scraper.start_crawl(job["mode"], job["start_maps"], job["end_map"], sub_map,
+                                    incremental=job.get("incremental", False), sink=sink)
+        finally:
+            csv_path, added = sink.close()
+            store.close()
+        log(f"🗄️ 本地比赛库新增 {added} 条成绩记录")
+        if csv_path:
+            scraper.write_metrics(csv_path)
+        emit("status", "💾 数据抓取完成", 0.7)
+
+        if not csv_path:
+            log("❌ 未抓取到数据或保存失败")
+            return
+        if cancel.is_set():
+            log("🛑 任务已取消，已抓取的数据已保存，跳过报表生成")
+            return
+
+        log("📊 正在生成可视化报表...")
+        report_path = ReportGenerator().generate_report(csv_path, sub_map, job.get("custom_pages", []), output_dir)
+        if report_path:
+            emit("result", str(report_path))
+            log(f"✅ 报表生成成功: {report_path.name}")
+        else:
+            log("❌ 报表生成失败")
+    finally:
+        finished.set()
+
+class _EmitHandler(logging.Handler):
+    """把工作进程内的 logging 输出 (如报表生成) 转发到界面日志"""
+
+    def __init__(self, emit):
+        super().__init__(logging.INFO)
+        self._emit = emit
+
+    def emit(self, record):
+        try:
+            self._emit("log", record.getMessage())
+        except Exception:
+            pass
+
+def _worker_main(jobs, events, cancel):
+    def emit(*msg):
+        events.put(msg)
+
+    root = logging.getLogger("src")
+    root.setLevel(logging.INFO)
+    root.addHandler(_EmitHandler(emit))
+
+    # 进程常驻：启动后预热验证码模型，之后的任务不再等待模型加载
+    from src.core.captcha import warm_up
+    warm_up()
+    import src.core.scraper, src.core.report_gen  # noqa: F401  提前导入，首个任务不再等待
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        try:
+            run_job(job, emit, cancel)
+        except Exception as e:
+            emit("log", f"❌ 发生异常: {e}")
+            traceback.print_exc()
+        finally:
+            emit("done")
+
+class WorkerProcess:
+    """常驻的抓取工作进程 (界面进程侧的句柄)：提交任务、轮询消息、取消，进程崩溃后下次提交时自动重启"""
+
+    def __init__(self):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process = None
+        self._jobs = None
+        self._events = None
+        self._cancel = None
+        self.busy = False
+        self._stop_requested_at = None
+
+    def start(self):
+        if self._process is not None and self._process.is_alive():
+            return
+        self._jobs = self._ctx.Queue()
+        self._events = self._ctx.Queue()
+        self._cancel = self._ctx.Event()
+        self._process = self._ctx.Process(target=_worker_main, args=(self._jobs, self._events, self._cancel),
+                                          name="crawl-worker", daemon=True)
+        self._process.start()
+
+    def submit(self, job):
+        self.start()
+        self._cancel.clear()
+        self._stop_requested_at = None
+        self.busy = True
+        self._jobs.put(job)
+
+    def stop(self):
+        """请求取消当前任务；超过 STOP_GRACE 仍未结束时在 poll 中强制结束进程"""
+        if self.busy and self._cancel is not None:
+            self._cancel.set()
+            self._stop_requested_at = time.monotonic()
+
+    def poll(self):
+        """取出目前收到的全部消息 (不阻塞)；进程意外退出或被强制结束时补发错误与 done"""
+        messages = []
+        if self._events is None:
+            return messages
+        while True:
+            try:
+                msg = self._events.get_nowait()
+            except queue.Empty:
+                break
+            messages.append(msg)
+            if msg[0] == "done":
+                self.busy = False
+                self._stop_requested_at = None
+
+        if self.busy:
+            if not self._process.is_alive():
+                messages.append(("log", f"❌ 工作进程异常退出 (退出码 {self._process.exitcode})"))
+                messages.append(("done",))
+                self.busy = False
+            elif self._stop_requested_at and time.monotonic() - self._stop_requested_at > STOP_GRACE:
+                self._process.terminate()
+                self._process.join(1)
+                messages.append(("log", "🛑 工作进程未及时响应停止请求，已强制结束"))
+                messages.append(("done",))
+                self.busy = False
+                self._stop_requested_at = None
+        return messages
+
+    def shutdown(self, timeout=2.0):
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._cancel.set()
+            self._jobs.put(None)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._process = None
@@ -57,6 +57,14 @@ class App(ctk.CTk):
         # Start at home
         self.show_frame("home")
 
+        # 验证码模型不在界面进程预热：抓取在工作进程中进行 (由其自行预热)，账号页测试登录时才按需加载
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        # 关闭窗口时结束工作进程 (取消进行中的任务)
+        self.frames["home"].worker_proc.shutdown()
+        self.destroy()
+
     def create_nav_btn(self, text, name, row):
         btn = ctk.CTkButton(self.sidebar_frame, text=text, fg_color="transparent", text_color=("gray10", "#DCE4EE"), hover_color=("gray70", "gray30"), anchor="w", command=lambda: self.show_frame(name))
         btn.grid(row=row, column=0, padx=20, pady=10, sticky="ew")
@@ -2,7 +2,6 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
 from src.utils.config_manager import ConfigManager
-from src.core.scraper import CrazyCarScraper
 
 class AccountPage(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -143,8 +142,10 @@ class AccountPage(ctk.CTkFrame):
 
         def _do_login():
             try:
+                # 抓取模块 (requests/ddddocr) 在第一次登录时才导入，不拖慢启动
+                from src.core.scraper import CrazyCarScraper
                 scraper = CrazyCarScraper(phone, pwd, log_cb)
-                if scraper.login():
+                if scraper.login(use_saved=False):
                     self.after(0, lambda: self._on_login_success(phone, pwd))
                 else:
                     self.after(0, lambda: self._on_login_fail("账号或密码错误"))
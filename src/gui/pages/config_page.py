@@ -30,7 +30,7 @@ class ConfigPage(ctk.CTkFrame):
         add_row = ctk.CTkFrame(sub_frame)
         add_row.pack(fill="x", padx=10, pady=10)
         
-        self.new_key = ctk.CTkEntry(add_row, placeholder_text="原始名称")
+        self.new_key = ctk.CTkEntry(add_row, placeholder_text="原始名称 (前缀匹配: 名称*，正则: re:表达式)")
         self.new_key.pack(side="left", fill="x", expand=True, padx=5)
         
         self.new_val = ctk.CTkEntry(add_row, placeholder_text="显示名称")
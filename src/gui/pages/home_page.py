@@ -1,16 +1,14 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk
-import threading
 import queue
 import webbrowser
 import os
 from tkinter import messagebox
 from src.utils.config_manager import ConfigManager
 from src.utils.constants import OFFICIAL_MAP_ORDER, GAME_MODES
-from src.core.scraper import CrazyCarScraper
-from src.core.report_gen import ReportGenerator
 from src.utils.paths import get_data_dir
+from src.core.worker_process import WorkerProcess
 
 class HomePage(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -19,6 +17,7 @@ class HomePage(ctk.CTkFrame):
         self.config_manager = ConfigManager()
         self.log_queue = queue.Queue()
         self.is_running = False
+        self.worker_proc = WorkerProcess()
         
         # Grid layout
         self.grid_columnconfigure(0, weight=1)
@@ -40,6 +39,12 @@ class HomePage(ctk.CTkFrame):
         self.mode_menu.pack(side="right")
         ctk.CTkLabel(r1, text="模式:").pack(side="right", padx=5)
 
+        # 选择自定义阶段时按 mapCode 只抓取该阶段的地图
+        self.stage_var = ctk.StringVar(value="(按地图范围)")
+        self.stage_menu = ctk.CTkOptionMenu(r1, values=["(按地图范围)"], variable=self.stage_var, width=140)
+        self.stage_menu.pack(side="right", padx=(0, 20))
+        ctk.CTkLabel(r1, text="阶段:").pack(side="right", padx=5)
+
         # Row 2: Maps Selection (使用 ttk.Combobox 支持滚轮)
         r2 = ctk.CTkFrame(self.ctrl_frame, fg_color="transparent")
         r2.pack(fill="x", padx=10, pady=5)
@@ -67,6 +72,9 @@ class HomePage(ctk.CTkFrame):
         
         self.auto_open_var = ctk.BooleanVar(value=True)
         ctk.CTkCheckBox(r3, text="完成后自动打开报表", variable=self.auto_open_var).pack(side="left")
+
+        self.incremental_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(r3, text="增量抓取", variable=self.incremental_var).pack(side="left", padx=(10, 0))
         
         self.run_btn = ctk.CTkButton(r3, text="🏁 开始生成报表", font=("Microsoft YaHei UI", 16, "bold"), height=50, fg_color="#28A745", hover_color="#218838", command=self.start_process)
         self.run_btn.pack(side="right", fill="x", expand=True, padx=(20, 0))
@@ -108,8 +116,15 @@ class HomePage(ctk.CTkFrame):
 
         # Queue for updates (msg, progress_float)
         self.check_log_queue()
+        # 窗口出现后提前启动工作进程，让它在后台完成模块导入与验证码模型加载
+        self.after(1000, self.worker_proc.start)
 
     def on_show(self):
+        stages = [p.get("name", "未命名") for p in self.config_manager.get("custom_pages", [])]
+        self.stage_menu.configure(values=["(按地图范围)"] + stages)
+        if self.stage_var.get() not in stages:
+            self.stage_var.set("(按地图范围)")
+
         acc = self.config_manager.get_current_account()
         if acc:
             self.acc_label.configure(text=f"当前账号: {acc['phone']}")
@@ -178,65 +193,53 @@ class HomePage(ctk.CTkFrame):
             return
 
         self.is_running = True
-        self.run_btn.configure(state="disabled", text="⏳ 处理中...")
+        # 运行期间按钮切换为停止按钮
+        self.run_btn.configure(text="⏹ 停止抓取", fg_color="#DC3545", hover_color="#C82333", command=self.stop_process)
         
         # Reset UI
         self.result_frame.place_forget()
         self.status_container.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.8)
         self.status_label.configure(text="正在初始化...", text_color=("black", "white"))
         self.progress_bar.set(0)
-        
-        thread = threading.Thread(target=self.worker, args=(acc,))
-        thread.start()
 
-    def worker(self, acc):
-        try:
-            self.log("🚀 初始化爬虫...")
-            scraper = CrazyCarScraper(acc['phone'], acc['password'], self.log)
-            
-            if not scraper.login():
-                self.log("❌ 登录失败，终止任务")
-                return
-
-            self.update_status("🔍 正在抓取比赛数据...", 0.3)
-            end_map = self.end_map_var.get()
-            if "不限制" in end_map: end_map = ""
-            
-            mode = self.mode_var.get()
-            start_map_val = self.start_map_var.get()
-            start_maps = [start_map_val]
-            
-            # Scrape
-            header, data = scraper.start_crawl(mode, start_maps, end_map, self.config_manager.get("substitution_map"))
-            self.update_status("💾 数据抓取完成，正在保存...", 0.7)
-            
-            # Save CSV
-            csv_path = scraper.save_to_csv(header, data, str(get_data_dir()))
-            
-            if csv_path:
-                self.log("📊 正在生成可视化报表...")
-                gen = ReportGenerator()
-                
-                custom_pages = self.config_manager.get("custom_pages", [])
-                sub_map = self.config_manager.get("substitution_map", {})
-                
-                report_path = gen.generate_report(csv_path, sub_map, custom_pages, get_data_dir())
-                
-                if report_path:
-                    # Pass full path object, UI will handle extraction
-                    self.current_report_path = report_path.name
-                    self.log(f"✅ 报表生成成功: {report_path.name}")
-                    if self.auto_open_var.get():
-                        webbrowser.open(f"file://{os.path.abspath(report_path)}")
-                else:
-                    self.log("❌ 报表生成失败")
-            else:
-                self.log("❌ 未抓取到数据或保存失败")
-
-        except Exception as e:
-            self.log(f"❌ 发生异常: {e}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            self.is_running = False
-            self.after(0, lambda: self.run_btn.configure(state="normal", text="🏁 开始生成报表"))
+        end_map = self.end_map_var.get()
+        if "不限制" in end_map: end_map = ""
+        stage = next((p for p in self.config_manager.get("custom_pages", []) if p.get("name") == self.stage_var.get()), None)
+        job = {
+            "phone": acc['phone'],
+            "password": acc['password'],
+            "mode": self.mode_var.get(),
+            "start_maps": [self.start_map_var.get()],
+            "end_map": end_map,
+            "stage": stage,
+            "incremental": self.incremental_var.get(),
+            "sub_map": self.config_manager.get("substitution_map", {}),
+            "custom_pages": self.config_manager.get("custom_pages", []),
+            "output_dir": str(get_data_dir()),
+        }
+        # 抓取与报表生成在独立的工作进程中执行，界面进程只处理消息
+        self.worker_proc.submit(job)
+        self.after(100, self.poll_worker)
+
+    def stop_process(self):
+        if self.is_running:
+            self.worker_proc.stop()
+            self.run_btn.configure(state="disabled", text="⏳ 正在停止...")
+
+    def poll_worker(self):
+        for kind, *payload in self.worker_proc.poll():
+            if kind == "log":
+                self.log(payload[0])
+            elif kind == "status":
+                self.update_status(*payload)
+            elif kind == "result":
+                report_path = payload[0]
+                self.current_report_path = os.path.basename(report_path)
+                if self.auto_open_var.get():
+                    webbrowser.open(f"file://{os.path.abspath(report_path)}")
+            elif kind == "done":
+                self.is_running = False
+                self.run_btn.configure(state="normal", text="🏁 开始生成报表", fg_color="#28A745",
+                                       hover_color="#218838", command=self.start_process)
+        if self.is_running:
+            self.after(100, self.poll_worker)
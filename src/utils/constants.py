@@ -12,3 +12,6 @@ OFFICIAL_MAP_ORDER = [
 ]
 
 GAME_MODES = ["个人竞速", "组队竞速", "个人道具", "组队道具", "个人疾爽", "组队疾爽"]
+
+# 列表页 mapCode 查询参数取值；未列出的地图直接使用地图名
+MAP_CODES = {}
@@ -31,3 +31,6 @@ def get_config_dir():
 
 def get_data_dir():
     return get_project_root() / "data"
+
+def get_cache_dir():
+    return get_data_dir() / "cache"
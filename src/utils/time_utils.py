@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M",
+            "%m-%d %H:%M:%S", "%m-%d %H:%M"]
+
+def parse_start_time(raw, default_year=2026):
+    """解析比赛开始时间，兼容 "01-18 22:59" 这类不带年份的格式，无法解析时返回 None"""
+    raw = str(raw).strip().lstrip("'")
+    for fmt in _FORMATS:
+        try:
+            dt = datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+        if "%Y" not in fmt:
+            dt = dt.replace(year=default_year)
+        return dt
+    return None
+
+def resolve_start_time(raw, reference=None):
+    """解析比赛开始时间并推断缺少的年份：取参照时间 (默认当前时间，即抓取时间) 所在年份，
+    月日晚于参照时间 (超过一天，留出时区误差) 时说明是去年的比赛"""
+    reference = reference or datetime.now()
+    dt = parse_start_time(raw, reference.year)
+    if dt is None:
+        return None
+    raw = str(raw).strip().lstrip("'")
+    if not raw[:4].isdigit() and dt > reference + timedelta(days=1):
+        dt = dt.replace(year=reference.year - 1)
+    return dt
@@ -0,0 +1,42 @@
+from src.core.name_normalizer import NameNormalizer, get_normalizer
+
+
+def test_exact_prefix_and_regex_rules():
+    normalizer = NameNormalizer({"新手o↘.": "新手", "路人*": "路人", "re:^\\[.+?\\](.+)$": "\\1"})
+    assert normalizer(" 新手o↘.\xa0") == "新手"
+    assert normalizer("路人甲") == "路人"
+    assert normalizer("[战队]小明") == "小明"
+    assert normalizer("小红") == "小红"
+
+
+def test_rules_are_tried_in_config_order():
+    normalizer = NameNormalizer({"re:^\\[A\\](.+)$": "A-\\1", "re:^\\[.+?\\](.+)$": "\\1"})
+    assert normalizer("[A]小明") == "A-小明"
+    assert normalizer("[B]小明") == "小明"
+
+
+def test_duplicate_group_names_do_not_break_other_rules():
+    # 两条各自合法的规则使用同名分组，拼接成一个正则会报 redefinition of group name
+    normalizer = get_normalizer({
+        "re:^\\[(?P<tag>.+?)\\](?P<name>.+)$": "\\g<name>",
+        "re:^\\((?P<tag>.+?)\\)(?P<name>.+)$": "\\g<name>",
+        "新手*": "新手",
+    })
+    assert normalizer("[战队]小明") == "小明"
+    assert normalizer("(战队)小红") == "小红"
+    assert normalizer("新手o↘.") == "新手"
+    assert normalizer("路人") == "路人"
+
+
+def test_numeric_backreference_keeps_its_own_group():
+    # 拼接后 \1 会指向外层分组 (cannot refer to an open group) 或其他规则的分组
+    normalizer = NameNormalizer({"re:^\\[(.+?)\\](.+)$": "\\2", "re:^(.)\\1(.*)$": "叠字\\2"})
+    assert normalizer("[战队]小明") == "小明"
+    assert normalizer("哈哈怪") == "叠字怪"
+    assert normalizer("哈嘿怪") == "哈嘿怪"
+
+
+def test_invalid_rule_is_ignored():
+    normalizer = NameNormalizer({"re:([": "坏规则", "路人*": "路人"})
+    assert normalizer("路人甲") == "路人"
+    assert normalizer("([") == "(["
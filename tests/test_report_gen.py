@@ -0,0 +1,68 @@
+import csv
+
+import pytest
+
+from src.core.report_gen import ReportGenerator
+
+HEADER = ["模式", "地图", "开始时间", "角色", "车辆", "队伍", "排名", "成绩", "经验", "金币"]
+
+
+def match_rows(start_time, map_name, players):
+    return [["组队竞速", map_name, start_time, name, "A车", "红队" if i % 2 == 0 else "蓝队", i + 1, "'01:23.45", 100, 20]
+            for i, name in enumerate(players)]
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return path
+
+
+@pytest.fixture
+def night():
+    players = ["甲", "乙", "丙", "丁"]
+    return [match_rows("01-19 20:00", "绿色山谷", players),
+            match_rows("01-19 20:05", "黄昏小镇", players[::-1]),
+            match_rows("01-19 20:10", "风车农场", players)]
+
+
+def season_aggregates(gen, files):
+    groups = gen.group_exports(files)
+    parts = gen._load_aggregates(groups, {}, max_workers=1)
+    return gen.merge_aggregates(parts)
+
+
+def assert_same_totals(actual, expected):
+    assert actual["players"][["总分", "场次"]].to_dict() == expected["players"][["总分", "场次"]].to_dict()
+    assert actual["ranks"].to_dict() == expected["ranks"].to_dict()
+    assert actual["matches"][["red", "blue"]].values.tolist() == expected["matches"][["red", "blue"]].values.tolist()
+
+
+def test_recrawled_night_is_not_counted_twice(tmp_path, night):
+    gen = ReportGenerator(use_cache=False)
+    rows = [r for match in night for r in match]
+    first = write_csv(tmp_path / "01-19_组队竞速.csv", rows)
+    second = write_csv(tmp_path / "01-19_组队竞速_2.csv", rows)
+
+    assert gen.group_exports([first, second]) == [(first, second)]
+    assert_same_totals(season_aggregates(gen, [first, second]), gen.aggregate_path(first, {}))
+
+
+def test_overlapping_crawls_are_merged(tmp_path, night):
+    gen = ReportGenerator(use_cache=False)
+    first = write_csv(tmp_path / "01-19_组队竞速.csv", night[0] + night[1])
+    second = write_csv(tmp_path / "01-19_组队竞速_2.csv", night[1] + night[2])
+    full = write_csv(tmp_path / "full.csv", night[0] + night[1] + night[2])
+
+    assert_same_totals(season_aggregates(gen, [first, second]), gen.aggregate_path(full, {}))
+
+
+def test_other_nights_and_modes_stay_separate(tmp_path, night):
+    gen = ReportGenerator(use_cache=False)
+    files = [write_csv(tmp_path / name, night[0])
+             for name in ("01-19_组队竞速.csv", "01-20_组队竞速.csv", "01-19_组队道具.csv")]
+
+    assert gen.group_exports(files) == [(f,) for f in files]
+    assert season_aggregates(gen, files)["players"]["场次"].tolist() == [3, 3, 3, 3]